@@ -0,0 +1,116 @@
+"""Headless benchmark of the Calet components build.
+
+Run it from the project folder:
+    python benchmarks/bench_calet.py [--max-time 0.5 | --rounds 1000] [--output bench_calet.json]
+
+Each component is instantiated and built as flet does when it's added to a page (without a page or
+a client). For every component it reports the build time, the size of its control tree and the
+bytes of the JSON payload sent to the client to show it."""
+
+import argparse
+import json
+
+from harness import BenchSuite
+import flet as ft
+from flet_core.protocol import CommandEncoder
+from calet_theme import ClTheme, ClLightTheme, ClDarkTheme
+from calet_button import *
+from calet_bar import *
+
+def make_theme():
+    return ClTheme(on_light=ClLightTheme(), on_dark=ClDarkTheme(), mode="dark")
+
+def component_factories(theme:ClTheme):
+    """Return a dict {component name: function creating a new instance of it}."""
+    return {
+        # buttons
+        "ClTextButton": lambda: ClTextButton(theme=theme, text="Text", icon=ft.icons.ADD),
+        "ClTonalButton": lambda: ClTonalButton(theme=theme, text="Tonal", icon=ft.icons.PEOPLE_OUTLINED),
+        "ClButton": lambda: ClButton(theme=theme, text="Button", icon=ft.icons.ADD),
+        "ClCristalButton": lambda: ClCristalButton(theme=theme, text="Cristal", icon=ft.icons.ADD),
+        "ClAcceptButton": lambda: ClAcceptButton(theme=theme, text="Accept", icon=ft.icons.CHECK),
+        "ClCancelButton": lambda: ClCancelButton(theme=theme, text="Cancel", icon=ft.icons.CLOSE),
+        "ClSelectButton": lambda: ClSelectButton(theme=theme, text="Select", icon=ft.icons.STAR_OUTLINE),
+        "ClModeButton": lambda: ClModeButton(
+            theme=theme, text="Light", second_text="Dark",
+            icon=ft.icons.LIGHT_MODE_OUTLINED, second_icon=ft.icons.DARK_MODE_OUTLINED
+        ),
+        "ClFilterButton": lambda: ClFilterButton(theme=theme, text="Filter"),
+        "ClOutlineFilterButton": lambda: ClOutlineFilterButton(theme=theme, text="Filter"),
+        "ClSlideButton": lambda: ClSlideButton(theme=theme, text="Slide"),
+        "ClExperimentalMenuTab": lambda: ClExperimentalMenuTab(theme=theme, text="Tab"),
+        "ClNavTab": lambda: ClNavTab(theme=theme, text="Tab"),
+        "ClMarkTab": lambda: ClMarkTab(theme=theme, text="Tab", icon=ft.icons.LOCAL_BAR_OUTLINED, height=40),
+        "ClIconButton": lambda: ClIconButton(theme=theme, icon=ft.icons.PERSON),
+        "ClNavButton": lambda: ClNavButton(theme=theme, label="Nav", icon=ft.icons.LOCAL_CAFE_OUTLINED),
+        "ClWinButton": lambda: ClWinButton(theme=theme),
+        "ClColorButton": lambda: ClColorButton(theme=theme, color="purple"),
+        "ClOptionButton": lambda: ClOptionButton(theme=theme, text="Option"),
+        "ClMenuButton": lambda: ClMenuButton(theme=theme, text="Menu", options=[
+            ClOptionButton(theme=theme, text="Option 1"),
+            ClOptionButton(theme=theme, text="Option 2")
+        ]),
+        "ClSwitch": lambda: ClSwitch(theme=theme, inactive_label="Off", active_label="On"),
+        "ClCustomSwitch": lambda: ClCustomSwitch(theme=theme),
+        "ClRadio": lambda: ClRadio(theme=theme, value="radio", label="Radio"),
+        "ClCheck": lambda: ClCheck(theme=theme, label="Check"),
+        # bars
+        "ClAppBar": lambda: ClAppBar(
+            theme=theme, title="App Bar", left_icon=ft.icons.SETTINGS,
+            win_actions=[ClWinButton(theme=theme, winaction="minimize"), ClWinButton(theme=theme)]
+        ),
+        "ClSelectionBar": lambda: ClSelectionBar(theme=theme, options=[
+            ClSlideButton(theme=theme, text="Option 1"),
+            ClSlideButton(theme=theme, text="Option 2")
+        ]),
+        "ClNavBar": lambda: ClNavBar(theme=theme, options=[
+            ClNavTab(theme=theme, text="Tab 1"),
+            ClNavTab(theme=theme, text="Tab 2")
+        ]),
+        "ClLateralNavBar": lambda: ClLateralNavBar(theme=theme, options=[
+            ClNavButton(theme=theme, label="Nav 1", icon=ft.icons.LOCAL_BAR_OUTLINED),
+            ClNavButton(theme=theme, label="Nav 2", icon=ft.icons.LOCAL_CAFE_OUTLINED)
+        ]),
+        "ClFilterBar": lambda: ClFilterBar(theme=theme, filters=[
+            ClFilterButton(theme=theme, text="Filter 1"),
+            ClFilterButton(theme=theme, text="Filter 2"),
+            ClFilterButton(theme=theme, text="Filter 3")
+        ])
+    }
+
+def build(component:ft.Control):
+    """Build the component like flet does when it's added to a page, return its add commands."""
+    added_controls = []
+    commands = component._build_add_commands(added_controls=added_controls)
+    return commands, added_controls
+
+def measure(component:ft.Control):
+    commands, added_controls = build(component)
+    return {
+        "controls": len(added_controls),
+        "payload_bytes": len(json.dumps(commands, cls=CommandEncoder, separators=(",", ":")).encode("utf-8"))
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Calet components build benchmark")
+    parser.add_argument("--max-time", type=float, default=0.5, help="seconds spent in each component")
+    parser.add_argument("--rounds", type=int, default=None, help="fixed number of builds of each component, instead of '--max-time'")
+    parser.add_argument("--no-memory", action="store_true", help="don't measure the peak memory of the builds")
+    parser.add_argument("--output", default="bench_calet.json", help="JSON file for the results")
+    args = parser.parse_args()
+
+    theme = make_theme()
+    suite = BenchSuite(name="calet", max_time=args.max_time, trace_memory=not args.no_memory)
+    if args.rounds is not None:
+        suite.min_rounds = suite.max_rounds = args.rounds
+    print(f"{'component':<24}{'rounds':>8}{'build (us)':>12}{'controls':>10}{'payload (B)':>13}{'peak (KiB)':>12}")
+    for name, factory in component_factories(theme).items():
+        info = measure(factory())
+        result = suite.bench(name=name, setup=lambda: (factory(),), func=build, info=info)
+        peak = f"{result.peak_memory / 1024:.1f}" if result.peak_memory is not None else "-"
+        print(f"{name:<24}{result.rounds:>8}{result.mean * 1e6:>12.2f}{info['controls']:>10}{info['payload_bytes']:>13}{peak:>12}")
+    suite.save(args.output)
+    print(f"\nResults saved in {args.output}")
+
+if __name__ == "__main__":
+    main()
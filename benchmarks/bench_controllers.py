@@ -0,0 +1,83 @@
+"""Benchmark of the hot paths of the Randomly controllers, no GUI needed.
+
+Run it from the project folder:
+    python benchmarks/bench_controllers.py [--max-size 100000] [--max-time 1.0] [--output bench_controllers.json]
+
+Sizes go from 10 to '--max-size' (up to 10^7) in powers of ten. Results are printed as a table
+and saved with the ops/s and peak memory of every case in a JSON file."""
+
+import argparse
+
+from harness import BenchSuite
+from randomly_control import RlyNumbersController, RlyChoicesController
+
+def make_choices(size:int):
+    return [f"choice-{i}" for i in range(size)]
+
+def make_controller(choices:list[str]):
+    controller = RlyChoicesController()
+    controller.choices = choices[:]
+    return controller
+
+def bench_choices(suite:BenchSuite, size:int):
+    choices = make_choices(size)
+    last = choices[-1]
+    # a shared controller is enough for the cases that don't change the choices
+    shared = make_controller(choices)
+
+    suite.report(suite.bench(
+        name="add_choice", size=size,
+        setup=lambda: (make_controller(choices),),
+        func=lambda controller: controller.add_choice("new choice")
+    ))
+    suite.report(suite.bench(
+        name="add_choices", size=size,
+        setup=lambda: (RlyChoicesController(),),
+        func=lambda controller: controller.add_choices(choices)
+    ))
+    suite.report(suite.bench(
+        name="generate_result", size=size,
+        func=lambda: shared.generate_result()
+    ))
+    suite.report(suite.bench(
+        name="generate_result (filtered)", size=size,
+        func=lambda: shared.generate_result(filter="choice-1")
+    ))
+    suite.report(suite.bench(
+        name="edit_choice", size=size,
+        setup=lambda: (make_controller(choices),),
+        func=lambda controller: controller.edit_choice(old=last, new="edited choice")
+    ))
+    suite.report(suite.bench(
+        name="remove_choice", size=size,
+        setup=lambda: (make_controller(choices),),
+        func=lambda controller: controller.remove_choice(last)
+    ))
+
+def bench_numbers(suite:BenchSuite, size:int):
+    controller = RlyNumbersController()
+    suite.report(suite.bench(
+        name="numbers generate_result", size=size,
+        func=lambda: controller.generate_result(limit_1=0, limit_2=size)
+    ))
+
+def main():
+    parser = argparse.ArgumentParser(description="Randomly controllers benchmark")
+    parser.add_argument("--max-size", type=int, default=100000, help="biggest list size, up to 10000000")
+    parser.add_argument("--max-time", type=float, default=1.0, help="seconds spent in each case")
+    parser.add_argument("--no-memory", action="store_true", help="don't measure the peak memory of the cases")
+    parser.add_argument("--output", default="bench_controllers.json", help="JSON file for the results")
+    args = parser.parse_args()
+
+    suite = BenchSuite(name="controllers", max_time=args.max_time, trace_memory=not args.no_memory)
+    suite.report()
+    size = 10
+    while size <= min(args.max_size, 10**7):
+        bench_choices(suite, size)
+        bench_numbers(suite, size)
+        size *= 10
+    suite.save(args.output)
+    print(f"\nResults saved in {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Small benchmark harness used by the scripts of this folder, in the style of pytest-benchmark.
+
+Every case is a function timed in rounds. A 'setup' function can build fresh arguments for each
+round without being timed. The peak memory of a case is measured in an extra traced round, so
+tracemalloc doesn't slow down the timed rounds."""
+
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+class BenchResult:
+
+    def __init__(self, name:str, size:int, times:list[float], peak_memory:int, info:dict=None):
+        self.name = name
+        self.size = size
+        self.rounds = len(times)
+        self.min = min(times)
+        self.max = max(times)
+        self.mean = sum(times) / len(times)
+        self.ops = 1 / self.mean if self.mean > 0 else float("inf")
+        self.peak_memory = peak_memory
+        self.info = info if info is not None else {}
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "size": self.size,
+            "rounds": self.rounds,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "ops": self.ops,
+            "peak_memory": self.peak_memory,
+            "info": self.info
+        }
+
+class BenchSuite:
+
+    def __init__(self, name:str, max_time:float=1.0, min_rounds:int=3, max_rounds:int=1000, trace_memory:bool=True):
+        """Use this properties to configure the suite:\n
+        ---
+        - name: is the name of the suite, saved in the JSON results.
+        - max_time: is the time in seconds spent in the rounds and setups of each case (at least 'min_rounds' are done).
+        - min_rounds: is the minimum number of timed rounds of each case.
+        - max_rounds: is the maximum number of timed rounds of each case.
+        - trace_memory: is a flag saying if the peak memory of each case must be measured.
+        """
+        self.name = name
+        self.max_time = max_time
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.trace_memory = trace_memory
+        self.results:list[BenchResult] = []
+
+    def bench(self, name:str, func, size:int=None, setup=None, info:dict=None):
+        """Time 'func' and save its result.\n
+        ---
+        - name: is the name of the case.
+        - func: is the function to time. It receives the arguments returned by 'setup', if any.
+        - size: is the input size of the case, to compare the results of a case between sizes.
+        - setup: is a function called before each round that returns a tuple with the arguments of 'func'.
+        - info: is a dict with extra measures of the case, saved in the JSON results.
+        """
+        times = []
+        # the setup time counts for 'max_time' too, so slow setups don't multiply the suite duration
+        started = time.perf_counter()
+        while len(times) < self.min_rounds or (time.perf_counter() - started < self.max_time and len(times) < self.max_rounds):
+            args = setup() if setup is not None else ()
+            start = time.perf_counter()
+            func(*args)
+            times.append(time.perf_counter() - start)
+        peak_memory = None
+        if self.trace_memory:
+            args = setup() if setup is not None else ()
+            tracemalloc.start()
+            try:
+                func(*args)
+                peak_memory = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        result = BenchResult(name=name, size=size, times=times, peak_memory=peak_memory, info=info)
+        self.results.append(result)
+        return result
+
+    def report(self, result:BenchResult=None):
+        """Print a line of the given result, or the whole table of results if none is given."""
+        if result is None:
+            print(f"{'case':<32}{'size':>10}{'rounds':>8}{'mean (us)':>14}{'ops/s':>14}{'peak (KiB)':>12}")
+            for result in self.results:
+                self.report(result)
+            return
+        peak = f"{result.peak_memory / 1024:.1f}" if result.peak_memory is not None else "-"
+        size = result.size if result.size is not None else "-"
+        print(f"{result.name:<32}{size:>10}{result.rounds:>8}{result.mean * 1e6:>14.2f}{result.ops:>14.1f}{peak:>12}")
+
+    def save(self, path:str):
+        """Save all results and the machine info in a JSON file."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({
+                "suite": self.name,
+                "datetime": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "machine": {
+                    "python": platform.python_version(),
+                    "implementation": platform.python_implementation(),
+                    "system": platform.system(),
+                    "processor": platform.processor()
+                },
+                "results": [result.to_dict() for result in self.results]
+            }, file, indent=2)
@@ -0,0 +1,220 @@
+"""Statistical quality tests of the Randomly generators, to show that draws are uniform.
+
+Run it from the project folder (needs numpy):
+    python benchmarks/randomness_quality.py [--samples 100000000] [--chunk 10000000] [--seed 2024] [--alpha 0.001]
+
+The controllers draw with random.Random (MT19937): 'randint' and 'choice' take the k = n.bit_length()
+high bits of a 32 bits output and reject the values >= n. That same stream is rebuilt with the numpy
+MT19937 from the state of the controller generator, and its first results are checked against the
+controller itself, so the tests run over the exact draws of the app but counted with numpy.
+Samples are processed in chunks: the tests keep only their accumulators, so memory doesn't grow
+with '--samples'.
+
+Tests: chi-square of the counts, Kolmogorov-Smirnov of the empirical distribution (conservative with
+discrete values), runs above/below the middle value, lag 1 serial correlation and gap test."""
+
+import argparse
+import math
+import random
+import sys
+import time
+
+import numpy as np
+import harness  # adds the project folder to sys.path
+from randomly_control import RlyNumbersController, RlyChoicesController
+
+# P-VALUES
+def normal_p_value(z:float):
+    """Two sided p-value of a standard normal statistic."""
+    return math.erfc(abs(z) / math.sqrt(2))
+
+def chi_square_p_value(statistic:float, freedom:int):
+    """Upper tail of the chi-square distribution (Wilson-Hilferty approximation, good for freedom > 10)."""
+    z = ((statistic / freedom) ** (1 / 3) - (1 - 2 / (9 * freedom))) / math.sqrt(2 / (9 * freedom))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def kolmogorov_p_value(statistic:float, size:int):
+    """Asymptotic p-value of the Kolmogorov-Smirnov statistic D for 'size' samples."""
+    x = math.sqrt(size) * statistic
+    if x < 0.2:
+        return 1.0
+    p_value = 2 * sum((-1) ** (k - 1) * math.exp(-2 * k * k * x * x) for k in range(1, 101))
+    return min(1.0, max(0.0, p_value))
+
+class RlyDrawStream:
+    """Results of 'random.Random._randbelow(n)' generated by chunks with numpy, starting
+    from the current state of a random.Random. Only valid for n <= 2^32.
+    """
+    def __init__(self, rng:random.Random, n:int):
+        if not 0 < n <= 2**32:
+            raise ValueError("The stream only supports 0 < n <= 2^32")
+        version, state, gauss = rng.getstate()
+        self.bit_generator = np.random.MT19937()
+        self.bit_generator.state = {
+            "bit_generator": "MT19937",
+            "state": {"key": np.array(state[:-1], dtype=np.uint32), "pos": state[-1]}
+        }
+        self.n = n
+        self.shift = np.uint64(32 - n.bit_length())
+        self.accept_rate = n / 2**n.bit_length()
+        # accepted values generated after the last chunk, they're the start of the next one
+        self.carry = np.empty(0, dtype=np.int64)
+
+    def take(self, size:int):
+        parts = [self.carry]
+        available = len(self.carry)
+        while available < size:
+            raw = self.bit_generator.random_raw(int((size - available) / self.accept_rate * 1.01) + 64)
+            values = raw >> self.shift
+            values = values[values < self.n].astype(np.int64)
+            parts.append(values)
+            available += len(values)
+        values = np.concatenate(parts)
+        self.carry = values[size:]
+        return values[:size]
+
+class RlyQualityTests:
+    """Streaming accumulators of the quality tests for values in range(n)."""
+
+    def __init__(self, n:int, gap_fraction:float=0.1):
+        self.n = n
+        self.size = 0
+        self.counts = np.zeros(n, dtype=np.int64)
+        # runs above/below the middle value
+        self.below = 0
+        self.runs = 0
+        self.last_below = None
+        # serial correlation, with the values centered to keep the float sums small
+        self.center = (n - 1) / 2
+        self.values_sum = 0.0
+        self.squares_sum = 0.0
+        self.products_sum = 0.0
+        self.last_value = None
+        # gap test: gaps between the values below 'gap_limit'
+        self.gap_limit = max(1, int(n * gap_fraction))
+        self.gap_probability = self.gap_limit / n
+        self.gap_max = max(1, math.ceil(math.log(0.01) / math.log(1 - self.gap_probability))) if self.gap_probability < 1 else 1
+        self.gap_counts = np.zeros(self.gap_max + 1, dtype=np.int64)
+        self.last_hit = None
+
+    def update(self, values:np.ndarray):
+        offset = self.size
+        self.size += len(values)
+        self.counts += np.bincount(values, minlength=self.n)
+
+        below = values < self.n // 2
+        self.below += int(np.count_nonzero(below))
+        self.runs += int(np.count_nonzero(below[1:] != below[:-1]))
+        self.runs += 1 if self.last_below is None or self.last_below != below[0] else 0
+        self.last_below = below[-1]
+
+        centered = values - self.center
+        self.values_sum += float(centered.sum())
+        self.squares_sum += float(np.dot(centered, centered))
+        self.products_sum += float(np.dot(centered[:-1], centered[1:]))
+        if self.last_value is not None:
+            self.products_sum += self.last_value * centered[0]
+        self.last_value = float(centered[-1])
+
+        hits = np.flatnonzero(values < self.gap_limit) + offset
+        if len(hits):
+            if self.last_hit is not None:
+                hits = np.concatenate(([self.last_hit], hits))
+            gaps = np.diff(hits) - 1
+            self.gap_counts += np.bincount(np.minimum(gaps, self.gap_max), minlength=self.gap_max + 1)
+            self.last_hit = hits[-1]
+
+    def results(self):
+        """Return a list of (test, statistic, p-value)."""
+        size = self.size
+        results = []
+
+        expected = size / self.n
+        chi_square = float(((self.counts - expected) ** 2).sum() / expected)
+        results.append(("chi-square", chi_square, chi_square_p_value(chi_square, self.n - 1)))
+
+        cumulative = np.cumsum(self.counts) / size
+        distance = float(np.abs(cumulative - np.arange(1, self.n + 1) / self.n).max())
+        results.append(("kolmogorov-smirnov", distance, kolmogorov_p_value(distance, size)))
+
+        above = size - self.below
+        runs_mean = 2 * self.below * above / size + 1
+        runs_variance = (runs_mean - 1) * (runs_mean - 2) / (size - 1)
+        runs_z = (self.runs - runs_mean) / math.sqrt(runs_variance)
+        results.append(("runs", runs_z, normal_p_value(runs_z)))
+
+        mean = self.values_sum / size
+        variance = self.squares_sum / size - mean * mean
+        correlation = (self.products_sum / (size - 1) - mean * mean) / variance
+        results.append(("serial correlation", correlation, normal_p_value(correlation * math.sqrt(size))))
+
+        gaps = int(self.gap_counts.sum())
+        p = self.gap_probability
+        probabilities = np.array([p * (1 - p) ** gap for gap in range(self.gap_max)] + [(1 - p) ** self.gap_max])
+        gap_expected = probabilities * gaps
+        gap_chi_square = float(((self.gap_counts - gap_expected) ** 2 / gap_expected).sum())
+        results.append(("gap", gap_chi_square, chi_square_p_value(gap_chi_square, self.gap_max)))
+        return results
+
+def numbers_case(seed:int, low:int, high:int, check:int):
+    """Stream of the numbers controller, checked against 'check' draws of the controller."""
+    controller = RlyNumbersController()
+    controller.audit = controller.session = None
+    controller.rng = random.Random(seed)
+    stream = RlyDrawStream(random.Random(seed), high - low + 1)
+    drawn = [controller.generate_result(low, high) - low for i in range(check)]
+    if drawn != stream.take(check).tolist():
+        raise AssertionError("The numpy stream doesn't reproduce RlyNumbersController draws")
+    return RlyDrawStream(random.Random(seed), high - low + 1)
+
+def choices_case(seed:int, size:int, check:int):
+    """Stream of the choices controller (indexes of the choices), checked against 'check' draws of the controller."""
+    controller = RlyChoicesController()
+    controller.audit = controller.session = None
+    controller.rng = random.Random(seed)
+    controller.choices = [f"choice-{i}" for i in range(size)]
+    indexes = {choice: index for index, choice in enumerate(controller.choices)}
+    stream = RlyDrawStream(random.Random(seed), size)
+    drawn = [indexes[controller.generate_result()] for i in range(check)]
+    if drawn != stream.take(check).tolist():
+        raise AssertionError("The numpy stream doesn't reproduce RlyChoicesController draws")
+    return RlyDrawStream(random.Random(seed), size)
+
+def run(name:str, stream:RlyDrawStream, samples:int, chunk:int, alpha:float):
+    start = time.perf_counter()
+    tests = RlyQualityTests(stream.n)
+    remaining = samples
+    while remaining > 0:
+        size = min(chunk, remaining)
+        tests.update(stream.take(size))
+        remaining -= size
+    failed = False
+    for test, statistic, p_value in tests.results():
+        passed = p_value >= alpha
+        failed = failed or not passed
+        print(f"{name:<28}{test:<22}{statistic:>14.6g}{p_value:>12.4g}{'PASS' if passed else 'FAIL':>7}")
+    print(f"{'':<28}{samples} samples in {time.perf_counter() - start:.1f} s")
+    return failed
+
+def main():
+    parser = argparse.ArgumentParser(description="Randomness quality tests of the Randomly controllers")
+    parser.add_argument("--samples", type=int, default=10**8, help="samples tested for each generator")
+    parser.add_argument("--chunk", type=int, default=10**7, help="samples processed at once")
+    parser.add_argument("--seed", type=int, default=2024, help="seed of the tested generators")
+    parser.add_argument("--alpha", type=float, default=0.001, help="significance level of each test")
+    parser.add_argument("--check", type=int, default=10000, help="controller draws compared with the numpy stream")
+    args = parser.parse_args()
+
+    cases = {
+        "numbers 1..100": lambda: numbers_case(args.seed, 1, 100, args.check),
+        "numbers 0..999999": lambda: numbers_case(args.seed, 0, 999999, args.check),
+        "choices (37)": lambda: choices_case(args.seed, 37, args.check)
+    }
+    print(f"{'generator':<28}{'test':<22}{'statistic':>14}{'p-value':>12}{'':>7}")
+    failed = False
+    for name, case in cases.items():
+        failed = run(name, case(), args.samples, args.chunk, args.alpha) or failed
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
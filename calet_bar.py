@@ -5,6 +5,7 @@ import flet as ft
 from calet_errors import *
 from calet_theme import *
 from calet_button import *
+from calet_trace import CL_TRACER
 import math
 
 # app title bar (ok)
@@ -955,11 +956,9 @@ class ClExperimentalMenuBar(ft.UserControl):
         )
     
     def tab_clicked(self, e:ft.TapEvent):
-        print("tab_clicked")
         # mapping the index of the clicked option and updating selection
         clicked_index = self.options_map[e.control.data][0]
-        print(self.selected_option)
-        print(clicked_index)
+        CL_TRACER.debug("ClExperimentalMenuBar.tab_clicked", selected_option=self.selected_option, clicked_index=clicked_index)
         if self.selected_option != clicked_index: # else nothing change in the selections
             self.options[self.selected_option].upd(selected=False)
             # self.options[clicked_index].upd(selected=True)
@@ -974,9 +973,8 @@ class ClExperimentalMenuBar(ft.UserControl):
                     self.options[clicked_index+1].upd(left_selected=True)
                 self.left_margin.bgcolor = self.theme.background_one if not self.options[0].selected else self.theme.background_two
                 self.right_margin.bgcolor = self.theme.background_one if not self.options[-1].selected else self.theme.background_two
-            print(f"old selected: {self.selected_option}")
+            CL_TRACER.debug("ClExperimentalMenuBar.selection_changed", old=self.selected_option, new=clicked_index)
             self.selected_option = clicked_index
-            print(f"new selected: {self.selected_option}")
             self.update()
             # openning submenu of clicked option
             # ...
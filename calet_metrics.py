@@ -0,0 +1,109 @@
+"""Calet: a visual components library based on Flet framework
+   - Metrics module"""
+
+import asyncio
+import functools
+import json
+import time
+from collections import deque
+
+class ClMetrics:
+    """Keeps the last durations and the counters of named operations (event handlers, controller methods...).
+    """
+    def __init__(self, window:int=1000):
+        """Use this properties to personalize the metrics:\n
+        ---
+        - window: is the number of last durations kept for each operation to compute its percentiles.
+        """
+        self.window = window
+        self.samples:dict[str, deque] = {}
+        self.counters:dict[str, int] = {}
+        self.errors:dict[str, int] = {}
+
+    def record(self, name:str, seconds:float):
+        """Add the duration of an operation and count it."""
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(seconds)
+        self.counters[name] = self.counters.get(name, 0) + 1
+
+    def error(self, name:str):
+        """Count an operation that raised an exception."""
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    def timed(self, name:str, func):
+        """Return 'func' wrapped with a timer recording its durations as 'name'.
+        Coroutine functions (async event handlers) are wrapped by a coroutine function timing until they end."""
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    self.error(name)
+                    raise
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            async_wrapper.cl_metrics_name = name
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                self.error(name)
+                raise
+            finally:
+                self.record(name, time.perf_counter() - start)
+        wrapper.cl_metrics_name = name
+        return wrapper
+
+    def instrument(self, cls, *method_names:str):
+        """Wrap the given methods of a class with timers named 'ClassName.method'.
+        Methods defined in a parent class are wrapped in the parent, so only once.
+        """
+        for method_name in method_names:
+            for owner in cls.__mro__:
+                if method_name in owner.__dict__:
+                    method = owner.__dict__[method_name]
+                    if not hasattr(method, "cl_metrics_name"):
+                        setattr(owner, method_name, self.timed(f"{owner.__name__}.{method_name}", method))
+                    break
+
+    def stats(self, name:str):
+        """Return a dict with the count, errors and p50, p95, p99 and max durations (in seconds) of an operation."""
+        samples = sorted(self.samples.get(name, ()))
+        stats = {"count": self.counters.get(name, 0), "errors": self.errors.get(name, 0)}
+        for percentile in (50, 95, 99):
+            stats[f"p{percentile}"] = samples[min(len(samples) - 1, len(samples) * percentile // 100)] if samples else None
+        stats["max"] = samples[-1] if samples else None
+        return stats
+
+    def report(self):
+        """Return a text table with the stats of all operations."""
+        lines = [f"{'operation':<44}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for name in sorted(self.samples):
+            stats = self.stats(name)
+            lines.append(
+                f"{name:<44}{stats['count']:>8}" + "".join(
+                    f"{stats[key] * 1000:>10.3f}" for key in ("p50", "p95", "p99", "max")
+                )
+            )
+        return "\n".join(lines)
+
+    def dump(self, path:str):
+        """Save the stats of all operations in a JSON file."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({name: self.stats(name) for name in sorted(self.samples)}, file, indent=2)
+
+    def reset(self):
+        self.samples.clear()
+        self.counters.clear()
+        self.errors.clear()
+
+# metrics shared by all the app
+CL_METRICS = ClMetrics()
@@ -0,0 +1,119 @@
+"""Calet: a visual components library based on Flet framework
+   - Tracing module"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+# TRACE LEVELS
+CL_DEBUG = 10
+CL_INFO = 20
+CL_WARNING = 30
+CL_ERROR = 40
+CL_OFF = 100
+CL_LEVELS = {"debug": CL_DEBUG, "info": CL_INFO, "warning": CL_WARNING, "error": CL_ERROR, "off": CL_OFF}
+CL_LEVEL_NAMES = {value: name for name, value in CL_LEVELS.items()}
+
+class ClTraceSink:
+    """Ring buffer of trace records written as JSON lines by a background thread,
+    so components never do I/O in their event handlers.
+    """
+    def __init__(self, path:str=None, capacity:int=10000, flush_interval:float=0.5):
+        """Use this properties to personalize the sink:\n
+        ---
+        - path: is the file where records are appended. If it's None records are written to stderr.
+        - capacity: is the max number of records waiting to be written. When it's full the oldest records are dropped.
+        - flush_interval: is the time in seconds between two writes of the waiting records.
+        """
+        self.path = path
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.records = deque(maxlen=capacity)
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+
+    def put(self, record:tuple):
+        if len(self.records) == self.capacity:
+            self.dropped += 1
+        self.records.append(record)
+        if self.thread is None:
+            self.start()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="calet-trace", daemon=True)
+                self.thread.start()
+                atexit.register(self.flush)
+
+    def run(self):
+        while True:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write all waiting records."""
+        with self.lock:
+            lines = []
+            while self.records:
+                moment, level, event, fields = self.records.popleft()
+                lines.append(json.dumps(
+                    {"time": moment, "level": CL_LEVEL_NAMES.get(level, level), "event": event, **fields},
+                    default=str
+                ))
+            if self.dropped:
+                lines.append(json.dumps({"time": time.time(), "level": "warning", "event": "calet_trace.dropped", "count": self.dropped}))
+                self.dropped = 0
+            if not lines:
+                return
+            if self.path is not None:
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write("\n".join(lines) + "\n")
+            else:
+                sys.stderr.write("\n".join(lines) + "\n")
+                sys.stderr.flush()
+
+class ClTracer:
+    """Structured tracing of Calet components. Records under the tracer level are discarded
+    without any work, so with the default 'off' level tracing costs only a comparison.
+    """
+    def __init__(self, level:int=CL_OFF, sink:ClTraceSink=None):
+        self.level = level
+        self.sink = sink if sink is not None else ClTraceSink()
+
+    def enabled(self, level:int):
+        return level >= self.level
+
+    def trace(self, level:int, event:str, **fields):
+        if level >= self.level:
+            self.sink.put((time.time(), level, event, fields))
+
+    def debug(self, event:str, **fields):
+        if CL_DEBUG >= self.level:
+            self.sink.put((time.time(), CL_DEBUG, event, fields))
+
+    def info(self, event:str, **fields):
+        if CL_INFO >= self.level:
+            self.sink.put((time.time(), CL_INFO, event, fields))
+
+    def warning(self, event:str, **fields):
+        if CL_WARNING >= self.level:
+            self.sink.put((time.time(), CL_WARNING, event, fields))
+
+    def error(self, event:str, **fields):
+        if CL_ERROR >= self.level:
+            self.sink.put((time.time(), CL_ERROR, event, fields))
+
+# tracer shared by all components, configured by the CALET_TRACE (debug, info, warning, error, off)
+# and CALET_TRACE_FILE (default: stderr) environment variables
+CL_TRACER = ClTracer(
+    level=CL_LEVELS.get(os.environ.get("CALET_TRACE", "off").strip().lower(), CL_OFF),
+    sink=ClTraceSink(path=os.environ.get("CALET_TRACE_FILE"))
+)
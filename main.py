@@ -1,8 +1,15 @@
+import atexit
 import flet as ft
-from randomly_app import RlyApp
 
 def main(page: ft.Page):
 
+    # app modules are loaded here, so the window is opened before importing them
+    from randomly_app import RlyApp
+    from randomly_workspaces import RlyWorkspaces
+    import randomly_metrics
+    if randomly_metrics.METRICS_ENABLED:
+        randomly_metrics.install()
+
     page.padding = 0
     page.window_width = 400
     page.window_height = 300
@@ -15,14 +22,25 @@ def main(page: ft.Page):
     page.theme_mode = ft.ThemeMode.DARK
     page.window_center()
 
+    # workspaces are read and written in the user folder only by the app, saved when it's closed
+    workspaces = RlyWorkspaces()
+    atexit.register(workspaces.save_all)
+    app = RlyApp(workspaces=workspaces)
     page.add(
         ft.Container(
             expand=True,
             alignment=ft.alignment.center,
-            content=RlyApp()
+            content=app
         )
     )
 
+    # hidden metrics panel, shown with Ctrl+Shift+M
+    if randomly_metrics.METRICS_ENABLED:
+        metrics_panel = randomly_metrics.RlyMetricsPanel(theme=app.theme)
+        page.overlay.append(metrics_panel)
+        page.on_keyboard_event = lambda e: metrics_panel.toggle() if e.ctrl and e.shift and e.key == "M" else None
+        page.update()
+
 if __name__ == "__main__":
 
     ft.app(target=main, assets_dir="assets")
\ No newline at end of file
@@ -3,13 +3,15 @@ from calet_theme import ClTheme, ClLightTheme, ClDarkTheme
 from calet_bar import ClAppBar, ClSelectionBar
 from calet_button import ClWinButton, ClSlideButton
 from randomly_numbers import RlyNumbersSection
-from randomly_choices import RlySelectionSection
+from randomly_workspaces import RlyWorkspaces
 
 class RlyApp(ft.UserControl):
 
-    def __init__(self):
+    def __init__(self, workspaces:RlyWorkspaces=None):
 
         super().__init__()
+        # named choices lists, created by the caller that saves them when the app is closed
+        self.workspaces = workspaces
         self.theme = ClTheme(
             on_light=ClLightTheme(),
             on_dark=ClDarkTheme(
@@ -42,8 +44,13 @@ class RlyApp(ft.UserControl):
         # APP SECTION
         # - numbers section
         self.app_numbers_section = RlyNumbersSection(theme=self.theme)
-        # - choices section
-        self.app_choices_section = RlySelectionSection(theme=self.theme, position="right")
+        # - choices section (it's off-screen at start, so it's built the first time it's shown)
+        self.app_choices_section = None
+        # - sections stack
+        self.app_sections = ft.Stack(
+            expand=True,
+            controls=[self.app_numbers_section]
+        )
         # - sections slide
         self.app_sections_slide = ClSelectionBar(
             expand=True,
@@ -75,18 +82,7 @@ class RlyApp(ft.UserControl):
                 spacing=0,
                 controls=[
                     ft.Divider(thickness=1, height=1, color=self.theme.divider),
-                    ft.Row(
-                        expand=3, 
-                        controls=[
-                            ft.Stack(
-                                expand=True,
-                                controls=[
-                                    self.app_numbers_section,
-                                    self.app_choices_section
-                                ]
-                            )
-                        ]
-                    ),
+                    ft.Row(expand=3, controls=[self.app_sections]),
                     ft.Row(expand=1, controls=[self.app_sections_slide])
                 ]
             )
@@ -113,12 +109,24 @@ class RlyApp(ft.UserControl):
 
     def b_numbers_section_clicked(self, e:ft.TapEvent):
         self.app_numbers_section.upd(position="center")
-        self.app_choices_section.upd(position="right")
+        if self.app_choices_section is not None:
+            self.app_choices_section.upd(position="right")
     
     def b_choices_section_clicked(self, e:ft.TapEvent):
+        if self.app_choices_section is None:
+            self.build_choices_section()
         self.app_numbers_section.upd(position="left")
         self.app_choices_section.upd(position="center")
 
     def b_close_clicked(self, e:ft.TapEvent):
-        self.app_choices_section.close_choices_page()
+        if self.app_choices_section is not None:
+            self.app_choices_section.close_choices_page()
         self.page.window_destroy()
+
+    # METODOS DE ACCION
+    def build_choices_section(self):
+        # its module is the biggest one of the app, so it's loaded here too
+        from randomly_choices import RlySelectionSection
+        self.app_choices_section = RlySelectionSection(theme=self.theme, position="right", workspaces=self.workspaces)
+        self.app_sections.controls.append(self.app_choices_section)
+        self.app_sections.update()
@@ -0,0 +1,117 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+import warnings
+from collections import deque
+
+class RlyAuditLog:
+    """Append-only log of draws. Every line is a JSON record with the hash of the previous line,
+    so any change or deletion of a record breaks the chain (see 'verify_audit_log').
+    Records are written by a background thread in groups, with one fsync per group,
+    so 'record' never waits for the disk.
+    """
+    def __init__(self, path:str, commit_interval:float=0.05, batch_size:int=1000):
+        self.path = path
+        self.commit_interval = commit_interval
+        self.batch_size = batch_size
+        self.pending = deque()
+        self.last_hash = self.read_last_hash()
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name="randomly-audit", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def read_last_hash(self):
+        """Hash of the last record of an existing log, the chain goes on from it. An incomplete
+        last line (the app stopped while writing a group) was never committed: it's cut from the log,
+        so the new records don't follow it in the same line."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return "0" * 64
+        with open(self.path, "r+b") as file:
+            end = file.seek(0, os.SEEK_END)
+            position = end
+            chunk = b""
+            complete = b""
+            # read back until the chunk has the whole last complete line
+            while position > 0 and complete.count(b"\n") < 2:
+                step = min(4096, position)
+                position -= step
+                file.seek(position)
+                chunk = file.read(step) + chunk
+                complete = chunk[:chunk.rfind(b"\n") + 1]
+            partial = len(chunk) - len(complete)
+            if partial:
+                warnings.warn(f"{partial} bytes of an incomplete record removed from the end of the audit log {self.path}")
+                file.truncate(end - partial)
+        lines = complete.split(b"\n")
+        if len(lines) < 2:
+            # the log only had an incomplete record
+            return "0" * 64
+        try:
+            return json.loads(lines[-2])["hash"]
+        except (ValueError, KeyError):
+            raise ValueError(f"The last record of the audit log {self.path} is damaged, the hash chain can't go on from it")
+
+    def record(self, **fields):
+        """Add a draw record to the log, it's written in the next group commit."""
+        fields["time"] = time.time()
+        self.pending.append(fields)
+        if len(self.pending) >= self.batch_size:
+            self.wake.set()
+
+    def run(self):
+        while not self.closed:
+            self.wake.wait(self.commit_interval)
+            self.wake.clear()
+            self.commit()
+
+    def commit(self):
+        """Write all pending records and fsync them."""
+        with self.lock:
+            if not self.pending:
+                return
+            lines = []
+            while self.pending:
+                fields = self.pending.popleft()
+                fields["prev"] = self.last_hash
+                body = json.dumps(fields, sort_keys=True, default=str)
+                self.last_hash = hashlib.sha256(body.encode("utf-8")).hexdigest()
+                lines.append(body[:-1] + f', "hash": "{self.last_hash}"}}')
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write("\n".join(lines) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.wake.set()
+            self.thread.join()
+            self.commit()
+
+def verify_audit_log(path:str):
+    """Check the hash chain of an audit log. Return the number of records, or raise ValueError
+    with the line number of the first broken record."""
+    last_hash = "0" * 64
+    count = 0
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, start=1):
+            try:
+                fields = json.loads(line)
+                record_hash = fields.pop("hash")
+            except (ValueError, KeyError):
+                raise ValueError(f"Audit log broken at line {number}")
+            body = json.dumps(fields, sort_keys=True, default=str)
+            if fields.get("prev") != last_hash or hashlib.sha256(body.encode("utf-8")).hexdigest() != record_hash:
+                raise ValueError(f"Audit log broken at line {number}")
+            last_hash = record_hash
+            count += 1
+    return count
+
+# audit log of the app, enabled with RANDOMLY_AUDIT_FILE=<path>
+RLY_AUDIT = RlyAuditLog(os.environ["RANDOMLY_AUDIT_FILE"]) if os.environ.get("RANDOMLY_AUDIT_FILE") else None
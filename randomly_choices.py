@@ -1,15 +1,23 @@
+import itertools
 import flet as ft
 from calet_theme import ClTheme
 from calet_button import ClWinButton, ClCristalButton, ClCancelButton, ClCheck, ClRadio, ClMenuButton, ClTextButton, ClOptionButton
 from calet_bar import ClAppBar
 from randomly_templates import RlyAppSection
 from randomly_control import RlyChoicesController
+from randomly_workspaces import RlyWorkspaces, DEFAULT_WORKSPACE
 
 class RlySelectionSection(RlyAppSection):
 
-    def __init__(self, theme:ClTheme, position:str="center"):
+    def __init__(self, theme:ClTheme, position:str="center", separate_window:bool=False, workspaces:RlyWorkspaces=None):
         super().__init__(theme=theme, position=position)
         self.controller = RlyChoicesController()
+        # named choices lists of the app, the controller draws from the one in use (without them the list isn't saved)
+        self.workspaces = workspaces
+        if self.workspaces is not None:
+            self.workspaces.switch(self.controller, DEFAULT_WORKSPACE)
+        # the choices list is shown over the app page unless a separate flet app window is asked
+        self.separate_window = separate_window
         self.choices_page = None
 
     def build(self):
@@ -72,6 +80,14 @@ class RlySelectionSection(RlyAppSection):
             content_size=12,
             action=self.b_choices_clicked
         )
+        # - workspaces menu
+        self.b_workspaces = ClMenuButton(
+            theme=self.theme,
+            options=self.workspace_options(),
+            icon=ft.icons.FOLDER_COPY_OUTLINED,
+            content_size=12,
+            crystaline=True
+        ) if self.workspaces is not None else None
         # - generate button
         self.b_generate = ClCristalButton(
             expand=3,
@@ -81,19 +97,24 @@ class RlySelectionSection(RlyAppSection):
             action=self.b_generate_clicked
         )
 
-        self.actions.controls.extend([ft.Container(expand=1), self.b_choices, self.choices_list_panel, self.b_generate, ft.Container(expand=1)])
+        self.actions.controls.append(ft.Container(expand=1))
+        if self.b_workspaces is not None:
+            self.actions.controls.append(self.b_workspaces)
+        self.actions.controls.extend([self.b_choices, self.choices_list_panel, self.b_generate, ft.Container(expand=1)])
 
         return self.section
     
     # METODOS DE ACCION
-    def b_generate_clicked(self, e:ft.TapEvent):
+    async def b_generate_clicked(self, e:ft.TapEvent):
 
         if not self.choices_filter.value:
             self.choices_filter.value = "A"
-        self.result.value = self.controller.generate_result(
+        # a filtered draw of a big list runs in the controllers executor, the window keeps repainting
+        self.result.value = await self.controller.generate_result_async(
             filter=self.choices_filter.value if self.choices_filter_check.value else None
         )
         self.result.size = self.controller.result_size()
+        self.stats.value = self.controller.history.summary()
         self.update()
 
     def tf_blurred(self, e:ft.ControlEvent):
@@ -101,12 +122,55 @@ class RlySelectionSection(RlyAppSection):
             e.control.value = "A"
             self.update()
     
+    def b_workspace_clicked(self, e:ft.ControlEvent):
+        self.switch_workspace(e.control.data)
+
+    def b_new_workspace_clicked(self, e:ft.ControlEvent):
+        names = set(self.workspaces.names())
+        number = len(names) + 1
+        while f"Lista {number}" in names:
+            number += 1
+        self.switch_workspace(f"Lista {number}")
+
     def b_choices_clicked(self, e:ft.TapEvent):
         if self.choices_page is None:
-            self.choices_page = RlyChoicesPage(theme=self.theme, choices_controller=self.controller)
+            if self.separate_window:
+                self.choices_page = RlyChoicesPage(theme=self.theme, choices_controller=self.controller)
+            else:
+                self.choices_page = RlyChoicesOverlay(theme=self.theme, choices_controller=self.controller, page=self.page)
         self.choices_page.open()
     
     # METODOS DE ACCION
+    def workspace_options(self):
+        current = self.controller.workspace.name
+        options = [
+            ClOptionButton(
+                theme=self.theme,
+                text=name,
+                icon=ft.icons.CHECK if name == current else ft.icons.LIST,
+                content_size=12,
+                data=name,
+                action=self.b_workspace_clicked
+            )
+            for name in self.workspaces.names()
+        ]
+        options.append(
+            ClOptionButton(theme=self.theme, text="Nueva lista", icon=ft.icons.ADD, content_size=12, action=self.b_new_workspace_clicked)
+        )
+        return options
+
+    def switch_workspace(self, name:str):
+        """Draw from the workspace 'name'. The views of the choices window share the controller,
+        only the choices list has to be shown again."""
+        if name == self.controller.workspace.name:
+            return
+        self.workspaces.switch(self.controller, name)
+        self.b_workspaces.button.controls[1:-1] = self.workspace_options()
+        self.stats.value = self.controller.history.summary()
+        if self.choices_page is not None:
+            self.choices_page.reload_list()
+        self.update()
+
     def close_choices_page(self):
         if self.choices_page is not None:
             self.choices_page.close()
@@ -118,6 +182,8 @@ class RlyChoicesPage:
         super().__init__()
         self.theme = theme
         self.controller = choices_controller
+        self.page = None
+        self.window = None
     
     def choices_main(self, choices_page: ft.Page):
 
@@ -132,11 +198,12 @@ class RlyChoicesPage:
         choices_page.theme_mode = ft.ThemeMode.DARK
         choices_page.window_center()
 
+        self.window = RlyChoicesWindow(self.theme, choices_controller=self.controller)
         choices_page.add(
             ft.Container(
                 expand=True,
                 alignment=ft.alignment.center,
-                content=RlyChoicesWindow(self.theme, choices_controller=self.controller)
+                content=self.window
             )
         )
 
@@ -153,12 +220,66 @@ class RlyChoicesPage:
             self.page.window_destroy()
             self.page = None
 
+    def reload_list(self):
+        # the choices list was replaced (another workspace), the window shows it again while it's open
+        if self.page is not None:
+            self.window.window_list_view.reload_choices_list(batch=len(self.controller.choices))
+
+class RlyChoicesOverlay:
+
+    def __init__(self, theme:ClTheme, choices_controller:RlyChoicesController, page:ft.Page, window_height:int=500):
+
+        self.theme = theme
+        self.controller = choices_controller
+        self.page = page
+        self.window_height = window_height
+        self.main_window_height = None
+        self.overlay = None
+
+    def build(self):
+
+        # the choices window is built once and then only shown or hidden
+        self.window = RlyChoicesWindow(self.theme, choices_controller=self.controller, on_close=self.close)
+        self.overlay = ft.Container(
+            left=0,
+            top=0,
+            right=0,
+            bottom=0,
+            visible=False,
+            alignment=ft.alignment.center,
+            content=self.window
+        )
+        self.page.overlay.append(self.overlay)
+
+    def open(self):
+        if not self.controller.choices_listed:
+            if self.overlay is None:
+                self.build()
+            self.main_window_height = self.page.window_height
+            self.page.window_height = self.window_height
+            self.overlay.visible = True
+            self.controller.choices_listed = True
+            self.page.update()
+
+    def close(self):
+        if self.controller.choices_listed:
+            self.controller.choices_listed = False
+            self.overlay.visible = False
+            self.page.window_height = self.main_window_height
+            self.page.update()
+
+    def reload_list(self):
+        # the choices list was replaced (another workspace), the window is built once and kept even while hidden
+        if self.overlay is not None:
+            self.window.window_list_view.reload_choices_list(batch=len(self.controller.choices))
+
 class RlyChoicesWindow(ft.UserControl):
 
-    def __init__(self, theme:ClTheme, choices_controller:RlyChoicesController):
+    def __init__(self, theme:ClTheme, choices_controller:RlyChoicesController, on_close=None):
         super().__init__()
         self.theme = theme
         self.controller = choices_controller
+        self.on_close = on_close
 
     def build(self):
         
@@ -188,6 +309,13 @@ class RlyChoicesWindow(ft.UserControl):
             position="right",
             go_view=self.go_view
         )
+        # - groups view
+        self.window_groups_view = RlyChoicesGroupsView(
+            theme=self.theme,
+            choices_controller=self.controller,
+            position="right",
+            go_view=self.go_view
+        )
 
         # WINDOW
         # - main overlay
@@ -212,7 +340,7 @@ class RlyChoicesWindow(ft.UserControl):
                                 ft.Divider(thickness=1, height=1, color=self.theme.divider),
                                 ft.Row(
                                     expand=9,
-                                    controls=[ft.Stack(expand=1, controls=[self.window_list_view, self.window_lote_view])]
+                                    controls=[ft.Stack(expand=1, controls=[self.window_list_view, self.window_lote_view, self.window_groups_view])]
                                 ),
                             ]
                         )
@@ -232,6 +360,9 @@ class RlyChoicesWindow(ft.UserControl):
 
     # METODOS MANEJADDORES DE EVENTOS
     def b_close_window_clicked(self, e:ft.TapEvent):
+        if self.on_close is not None:
+            self.on_close()
+            return
         self.controller.choices_listed = False
         self.page.window_destroy()
  
@@ -240,11 +371,17 @@ class RlyChoicesWindow(ft.UserControl):
         if view == "list":
             self.window_list_view.upd(position="center")
             self.window_lote_view.upd(position="right")
+            self.window_groups_view.upd(position="right")
             if reload_list:
                 self.window_list_view.reload_choices_list()
+        elif view == "groups":
+            self.window_list_view.upd(position="left")
+            self.window_lote_view.upd(position="right")
+            self.window_groups_view.upd(position="center")
         else:
             self.window_list_view.upd(position="left")
             self.window_lote_view.upd(position="center")
+            self.window_groups_view.upd(position="right")
         self.update()
 
     def open_dialog(self, dlg):
@@ -264,9 +401,14 @@ class RlyChoice(ft.UserControl):
         self.choice_row = choice_row
         self.controller = choice_controller
         self.expand = expand
+        self.choice = None
     
     def build(self):
 
+        # a recycled choice keeps the controls it already built
+        if self.choice is not None:
+            return self.choice
+
         # CHOICE CONTENT
         # - choice text
         self.choice_text = ft.Container(
@@ -299,6 +441,35 @@ class RlyChoice(ft.UserControl):
             icon=ft.icons.DELETE,
             action=self.b_delete_choice_clicked
         )
+
+        # CHOICE
+        # - read only panel
+        self.readonly_panel = ft.Container(
+            scale=1,
+            bgcolor=self.theme.transparent,
+            alignment=ft.alignment.center,
+            animate_scale=ft.Animation(200, ft.AnimationCurve.LINEAR_TO_EASE_OUT),
+            content=ft.Row(
+                spacing=5,
+                controls=[self.choice_text, self.b_edit_choice, self.b_delete_choice]
+            )
+        )
+        # - edition panel (built on demand by 'build_edition_panel')
+        self.edition_panel = None
+        # - choice
+        self.choice = ft.Container(
+            bgcolor=self.theme.transparent,
+            alignment=ft.alignment.center,
+            padding=5,
+            border=ft.border.only(bottom=ft.BorderSide(width=1, color=self.theme.divider)),
+            content=ft.Stack(controls=[self.readonly_panel])
+        )
+
+        return self.choice
+
+    def build_edition_panel(self):
+
+        # CHOICE EDITION CONTENT
         # - choice edition text field
         self.tf_edit_choice = ft.TextField(
             expand=8,
@@ -335,18 +506,7 @@ class RlyChoice(ft.UserControl):
             action=self.b_cancel_choice_edition_clicked
         )
 
-        # CHOICE
-        # - read only panel
-        self.readonly_panel = ft.Container(
-            scale=1,
-            bgcolor=self.theme.transparent,
-            alignment=ft.alignment.center,
-            animate_scale=ft.Animation(200, ft.AnimationCurve.LINEAR_TO_EASE_OUT),
-            content=ft.Row(
-                spacing=5,
-                controls=[self.choice_text, self.b_edit_choice, self.b_delete_choice]
-            )
-        )
+        # CHOICE EDITION
         # - edition panel
         self.edition_panel = ft.Container(
             scale=0,
@@ -358,44 +518,122 @@ class RlyChoice(ft.UserControl):
                 controls=[self.tf_edit_choice, self.b_confirm_choice_edition, self.b_cancel_choice_edition]
             )
         )
-        # - choice
-        self.choice = ft.Container(
-            bgcolor=self.theme.transparent,
-            alignment=ft.alignment.center,
-            padding=5,
-            border=ft.border.only(bottom=ft.BorderSide(width=1, color=self.theme.divider)),
-            content=ft.Stack(controls=[self.readonly_panel, self.edition_panel])
-        )
 
-        return self.choice
+        return self.edition_panel
     
     # METODOS MANEJADORES DE EVENTOS
     def b_edit_choice_clicked(self, e:ft.TapEvent):
+        if self.edition_panel is None:
+            self.choice.content.controls.append(self.build_edition_panel())
+            self.update()
         self.readonly_panel.scale = 0
         self.edition_panel.scale = 1
         self.update()
 
     def b_cancel_choice_edition_clicked(self, e:ft.TapEvent):
-        self.readonly_panel.scale = 1
-        self.edition_panel.scale = 0
-        self.update()
+        self.close_edition_panel()
     
     def b_confirm_choice_edition_clicked(self, e:ft.TapEvent):
         self.controller.edit_choice(old=self.text, new=self.tf_edit_choice.value)
         self.text = self.tf_edit_choice.value
         self.choice_text.content.value = self.text
-        self.readonly_panel.scale = 1
-        self.edition_panel.scale = 0
-        self.update()
+        self.close_edition_panel()
     
     def b_delete_choice_clicked(self, e:ft.TapEvent):
         self.controller.remove_choice(self.text)
-        self.choice_row.scale = 0
+        if self.choice_row.animate_scale is not None:
+            self.choice_row.scale = 0
+        else:
+            # rows without animation (bulk mode) are hidden until the next list reload
+            self.choice_row.visible = False
         self.choice_row.update()
 
+    # METODOS DE ACCION
+    def rebind(self, text:str, choice_row:ft.Row):
+        # used by 'RlyChoicesPool' to recycle a detached choice with a new text
+        self.text = text
+        self.choice_row = choice_row
+        if self.choice is not None:
+            self.choice_text.content.value = text
+            if self.edition_panel is not None:
+                self.choice.content.controls.remove(self.edition_panel)
+                self.edition_panel = None
+            self.readonly_panel.scale = 1
+
+    def close_edition_panel(self):
+        # the edition panel is dropped, so only the readonly panel stays alive in the row
+        if self.edition_panel is not None:
+            self.choice.content.controls.remove(self.edition_panel)
+            self.edition_panel = None
+            self.tf_edit_choice = None
+            self.b_confirm_choice_edition = None
+            self.b_cancel_choice_edition = None
+        self.readonly_panel.scale = 1
+        self.update()
+
+class RlyChoicesPool:
+
+    def __init__(self, theme:ClTheme, choices_controller:RlyChoicesController, on_animation_end, max_size:int=100):
+        self.theme = theme
+        self.controller = choices_controller
+        self.on_animation_end = on_animation_end
+        self.max_size = max_size
+        self.rows:list[ft.Row] = []
+        self.choices:list[RlyChoice] = []
+        self.hits = 0
+        self.misses = 0
+
+    def acquire_row(self, scale:int=1, animated:bool=True):
+        if self.rows:
+            self.hits += 1
+            row = self.rows.pop()
+            row.scale = scale
+            row.visible = True
+        else:
+            self.misses += 1
+            row = ft.Row(scale=scale, controls=[])
+        # rows of bulk operations are not animated, they are shown and hidden in a single frame
+        row.animate_scale = ft.Animation(200, ft.AnimationCurve.LINEAR_TO_EASE_OUT) if animated else None
+        row.on_animation_end = self.on_animation_end if animated else None
+        return row
+
+    def acquire_choice(self, text:str, choice_row:ft.Row):
+        if self.choices:
+            self.hits += 1
+            choice = self.choices.pop()
+            choice.rebind(text=text, choice_row=choice_row)
+        else:
+            self.misses += 1
+            choice = RlyChoice(
+                theme=self.theme,
+                text=text,
+                choice_row=choice_row,
+                choice_controller=self.controller,
+                expand=1
+            )
+        return choice
+
+    def acquire(self, text:str, scale:int=1, animated:bool=True):
+        row = self.acquire_row(scale=scale, animated=animated)
+        row.controls.append(self.acquire_choice(text=text, choice_row=row))
+        return row
+
+    def release(self, row:ft.Row):
+        # released controls must already be out of the page (or leave it in the next update)
+        for choice in row.controls:
+            if len(self.choices) < self.max_size:
+                self.choices.append(choice)
+        row.controls.clear()
+        if len(self.rows) < self.max_size:
+            self.rows.append(row)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "rows": len(self.rows), "choices": len(self.choices)}
+
 class RlyChoicesListView(ft.UserControl):
 
-    def __init__(self, theme:ClTheme, choices_controller:RlyChoicesController, go_view, position:str="center", expand:bool|int=False):
+    def __init__(self, theme:ClTheme, choices_controller:RlyChoicesController, go_view, position:str="center", expand:bool|int=False,
+                 bulk_size:int=50):
         super().__init__()
         self.theme = theme
         self.controller = choices_controller
@@ -403,6 +641,13 @@ class RlyChoicesListView(ft.UserControl):
         self.offset = ft.Offset({"left": -1.1, "center": 0, "right": 1.1}[position], y=0)
         self.animate_offset = ft.Animation(200, ft.AnimationCurve.LINEAR_TO_EASE_OUT)
         self.expand = expand
+        # batches (lotes, undos, lists loaded) of more than 'bulk_size' choices are shown without per row animations
+        self.bulk_size = bulk_size
+        self.choices_pool = RlyChoicesPool(
+            theme=self.theme,
+            choices_controller=self.controller,
+            on_animation_end=self.choice_animation_ended
+        )
     
     def build(self):
 
@@ -442,26 +687,10 @@ class RlyChoicesListView(ft.UserControl):
             content=ft.Row(spacing=5, controls=[self.tf_new_choice, self.b_add_choice])
         )
         # - choices list
-        self.choices_list = [ft.Row(
-            scale=0,
-            animate_scale=ft.Animation(200, ft.AnimationCurve.LINEAR_TO_EASE_OUT),
-            on_animation_end=self.choice_animation_ended,
-            controls=[]
-        )]
+        self.choices_list = [self.choices_pool.acquire_row(scale=0)]
+        animated = not self.is_bulk(len(self.controller.choices))
         for choice in self.controller.choices[::-1]:
-            row = ft.Row(
-                animate_scale=ft.Animation(200, ft.AnimationCurve.LINEAR_TO_EASE_OUT),
-                on_animation_end=self.choice_animation_ended,
-                controls=[]
-            )
-            row.controls.append(RlyChoice(
-                theme=self.theme, 
-                text=choice, 
-                choice_row=row,
-                choice_controller=self.controller,
-                expand=1
-            ))
-            self.choices_list.append(row)
+            self.choices_list.append(self.choices_pool.acquire(text=choice, animated=animated))
         # - window choices list panel
         self.choices_list_panel = ft.Container(
             expand=True,
@@ -475,9 +704,34 @@ class RlyChoicesListView(ft.UserControl):
         )
 
         # VIEW ACTIONS
+        # - undo and redo buttons
+        self.b_undo = ClCristalButton(
+            expand=1,
+            height=40,
+            theme=self.theme,
+            icon=ft.icons.UNDO,
+            action=self.b_undo_clicked
+        )
+        self.b_redo = ClCristalButton(
+            expand=1,
+            height=40,
+            theme=self.theme,
+            icon=ft.icons.REDO,
+            action=self.b_redo_clicked
+        )
+        # - split choices in groups button
+        self.b_groups = ClCristalButton(
+            expand=3,
+            height=40,
+            theme=self.theme,
+            text="Grupos",
+            icon=ft.icons.GROUPS_OUTLINED,
+            content_size=12,
+            action=lambda e: self.go_view("groups")
+        )
         # - add choices by lote button
         self.b_add_bylote = ClCristalButton(
-            expand=9,
+            expand=4,
             height=40,
             theme=self.theme,
             text="Agregar un lote",
@@ -495,7 +749,7 @@ class RlyChoicesListView(ft.UserControl):
                 controls=[
                     ft.Row(expand=1, controls=[self.new_choice_panel]),
                     ft.Row(expand=8, controls=[self.choices_list_panel]),
-                    ft.Row(expand=1, controls=[self.b_add_bylote])
+                    ft.Row(expand=1, controls=[self.b_undo, self.b_redo, self.b_groups, self.b_add_bylote])
                 ]
             )
         )
@@ -506,47 +760,48 @@ class RlyChoicesListView(ft.UserControl):
     def b_add_choice_clicked(self, e:ft.TapEvent):
         added = self.controller.add_choice(self.tf_new_choice.value)
         if added:
-            self.choices_list[0].controls.append(RlyChoice(
-                theme=self.theme,
+            self.choices_list[0].controls.append(self.choices_pool.acquire_choice(
                 text=self.tf_new_choice.value,
-                choice_row=self.choices_list[0],
-                choice_controller=self.controller,
-                expand=1
+                choice_row=self.choices_list[0]
             ))
             self.choices_list[0].scale = 1
-            self.choices_list.insert(0, ft.Row(
-                scale=0,
-                animate_scale=ft.Animation(200, ft.AnimationCurve.LINEAR_TO_EASE_OUT),
-                on_animation_end=self.choice_animation_ended,
-                controls=[]
-            ))
+            self.choices_list.insert(0, self.choices_pool.acquire_row(scale=0))
             self.tf_new_choice.value = ""
             self.update()
 
+    def b_undo_clicked(self, e:ft.TapEvent):
+        if self.controller.undo():
+            self.reload_choices_list()
+
+    def b_redo_clicked(self, e:ft.TapEvent):
+        if self.controller.redo():
+            self.reload_choices_list()
+
     # METODOS DE ACCION
     def choice_animation_ended(self, e:ft.ControlEvent):
-        if e.control.scale == 0:
+        if e.control.scale == 0 and e.control in self.choices_list[1:]:
             self.choices_list.remove(e.control)
+            self.choices_pool.release(e.control)
             self.update()
     
-    def reload_choices_list(self):
+    def reload_choices_list(self, batch:int=None):
+        """Show the choices of the controller again. 'batch' is the number of choices changed
+        (by default, the choices added or removed since the list was shown)."""
+        if batch is None:
+            batch = abs(len(self.controller.choices) - (len(self.choices_list) - 1))
+        animated = not self.is_bulk(batch)
+        # new rows are taken before releasing the old ones, so no row is reused while it's still in the page
+        old_rows = self.choices_list[1:]
         del self.choices_list[1:]
         for choice in self.controller.choices[::-1]:
-            row = ft.Row(
-                animate_scale=ft.Animation(200, ft.AnimationCurve.LINEAR_TO_EASE_OUT),
-                on_animation_end=self.choice_animation_ended,
-                controls=[]
-            )
-            row.controls.append(RlyChoice(
-                theme=self.theme, 
-                text=choice, 
-                choice_row=row,
-                choice_controller=self.controller,
-                expand=1
-            ))
-            self.choices_list.append(row)
+            self.choices_list.append(self.choices_pool.acquire(text=choice, animated=animated))
+        for row in old_rows:
+            self.choices_pool.release(row)
         self.update()
 
+    def is_bulk(self, batch:int):
+        return batch > self.bulk_size
+
     def upd(self, position:str=None):
         if position is not None:
             self.offset.x = {"left": -1.1, "center": 0, "right": 1.1}[position]
@@ -736,13 +991,13 @@ class RlyChoicesLoteView(ft.UserControl):
             self.tf_byother_split.visible = False
         self.update()
 
-    def b_add_lote_clicked(self, e:ft.TapEvent):
+    async def b_add_lote_clicked(self, e:ft.TapEvent):
         if self.tf_new_lote.value:
             if self.rg_split_options.value != "other":
-                self.controller.add_choices(self.tf_new_lote.value.split(self.rg_split_options.value))
+                await self.controller.add_choices_async(self.tf_new_lote.value.split(self.rg_split_options.value))
                 self.go_view(view="list", reload_list=True)
             elif self.tf_byother_split.value:
-                self.controller.add_choices(self.tf_new_lote.value.split(self.tf_byother_split.value))
+                await self.controller.add_choices_async(self.tf_new_lote.value.split(self.tf_byother_split.value))
                 self.go_view(view="list", reload_list=True)
             self.update()
 
@@ -752,6 +1007,190 @@ class RlyChoicesLoteView(ft.UserControl):
             self.offset.x = {"left": -1.1, "center": 0, "right": 1.1}[position]
             self.update()
 
+class RlyChoicesGroupsView(ft.UserControl):
+
+    def __init__(self, theme:ClTheme, choices_controller:RlyChoicesController, go_view, position:str="center", expand:bool|int=False,
+                 page_size:int=20):
+        super().__init__()
+        self.theme = theme
+        self.controller = choices_controller
+        self.go_view = go_view
+        self.offset = ft.Offset({"left": -1.1, "center": 0, "right": 1.1}[position], y=0)
+        self.animate_offset = ft.Animation(200, ft.AnimationCurve.LINEAR_TO_EASE_OUT)
+        self.expand = expand
+        # groups are shown 'page_size' at a time, the next ones are taken from the split when asked
+        self.page_size = page_size
+        self.groups = None
+        self.groups_total = 0
+
+    def build(self):
+
+        # VIEW CONTENT
+        # - groups label
+        self.groups_label = ft.Text(
+            value="Reparte las posibilidades en grupos del mismo tamaño.",
+            color=self.theme.font_one,
+            size=12,
+        )
+        # - number of groups label
+        self.groups_number_label = ft.Container(
+            expand=3,
+            alignment=ft.alignment.center,
+            content=ft.Text(
+                value="Número de grupos",
+                color=self.theme.font_one,
+                size=12,
+                text_align=ft.TextAlign.CENTER
+            )
+        )
+        # - number of groups input field
+        self.tf_groups_number = ft.TextField(
+            expand=2,
+            value="2",
+            text_size=12,
+            content_padding=5,
+            text_align=ft.TextAlign.CENTER,
+            color=self.theme.font_two,
+            focused_color=self.theme.font_three,
+            bgcolor=self.theme.transparent_1,
+            focused_bgcolor=self.theme.transparent_05,
+            border_color=self.theme.transparent,
+            focused_border_color=self.theme.transparent,
+            cursor_color=self.theme.font_two,
+            selection_color=self.theme.primary,
+            input_filter=ft.NumbersOnlyInputFilter(),
+            on_blur=self.tf_blurred
+        )
+        # - number of groups panel
+        self.groups_number_panel = ft.Container(
+            expand=1,
+            bgcolor=self.theme.transparent_1,
+            alignment=ft.alignment.center,
+            padding=5,
+            border_radius=10,
+            content=ft.Row(spacing=0, controls=[self.groups_number_label, self.tf_groups_number])
+        )
+        # - more groups button
+        self.b_more_groups = ClTextButton(
+            theme=self.theme,
+            text="Ver más grupos",
+            icon=ft.icons.EXPAND_MORE,
+            content_size=12,
+            action=self.b_more_groups_clicked
+        )
+        self.b_more_groups.visible = False
+        # - groups list
+        self.groups_list = ft.Column(
+            spacing=5,
+            controls=[]
+        )
+        # - groups list panel
+        self.groups_list_panel = ft.Container(
+            expand=True,
+            alignment=ft.alignment.top_center,
+            padding=5,
+            content=ft.Column(
+                spacing=5,
+                scroll=ft.ScrollMode.ADAPTIVE,
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                controls=[self.groups_list, self.b_more_groups]
+            )
+        )
+
+        # VIEW ACTIONS
+        # - back to choices list view button
+        self.b_back_to_list = ClCristalButton(
+            expand=1,
+            height=40,
+            theme=self.theme,
+            text="Lista",
+            icon=ft.icons.NAVIGATE_BEFORE,
+            content_size=12,
+            action=lambda e: self.go_view("list")
+        )
+        # - split in groups button
+        self.b_split = ClCristalButton(
+            expand=2,
+            height=40,
+            theme=self.theme,
+            text="Formar grupos",
+            icon=ft.icons.SHUFFLE,
+            content_size=12,
+            action=self.b_split_clicked
+        )
+
+        # VIEW
+        self.view = ft.Container(
+            alignment=ft.alignment.center,
+            content=ft.Column(
+                spacing=5,
+                controls=[
+                    self.groups_label,
+                    ft.Row(expand=1, controls=[self.groups_number_panel]),
+                    ft.Row(expand=8, controls=[self.groups_list_panel]),
+                    ft.Row(expand=1, controls=[self.b_back_to_list, self.b_split])
+                ]
+            )
+        )
+
+        return self.view
+
+    # METODOS MANEJADORES DE EVENTOS
+    def tf_blurred(self, e:ft.ControlEvent):
+        if not e.control.value or int(e.control.value) < 1:
+            e.control.value = "1"
+            self.update()
+
+    def b_split_clicked(self, e:ft.TapEvent):
+        if not self.tf_groups_number.value or int(self.tf_groups_number.value) < 1:
+            self.tf_groups_number.value = "1"
+        if self.controller.choices:
+            self.groups_total = min(int(self.tf_groups_number.value), len(self.controller.choices))
+            self.groups = enumerate(self.controller.split_groups(self.groups_total), start=1)
+            self.groups_list.controls.clear()
+            self.load_groups()
+        self.update()
+
+    def b_more_groups_clicked(self, e:ft.TapEvent):
+        self.load_groups()
+        self.update()
+
+    # METODOS DE ACCION
+    def load_groups(self):
+        for number, group in itertools.islice(self.groups, self.page_size):
+            self.groups_list.controls.append(self.group_card(number, group))
+        self.b_more_groups.visible = len(self.groups_list.controls) < self.groups_total
+
+    def group_card(self, number:int, group:list[str]):
+        # one text per group, not a control per choice, so big groups are cheap to show
+        return ft.Container(
+            bgcolor=self.theme.transparent_05,
+            padding=10,
+            border_radius=10,
+            content=ft.Column(
+                spacing=2,
+                controls=[
+                    ft.Text(
+                        value=f"Grupo {number}  ·  {len(group)}",
+                        color=self.theme.font_two,
+                        size=12,
+                        weight=ft.FontWeight.BOLD
+                    ),
+                    ft.Text(
+                        value=", ".join(group),
+                        color=self.theme.font_one,
+                        size=12,
+                        selectable=True
+                    )
+                ]
+            )
+        )
+
+    def upd(self, position:str=None):
+        if position is not None:
+            self.offset.x = {"left": -1.1, "center": 0, "right": 1.1}[position]
+            self.update()
+
 class RlyLoteChoicesDlg(ft.UserControl):
 
     def __init__(self, theme:ClTheme, choices_controller:RlyChoicesController, reload_choices_list, close_dialog):
@@ -939,11 +1378,11 @@ class RlyLoteChoicesDlg(ft.UserControl):
 
         return self.dlg_overlay
     
-    def b_add_choices_lote_clicked(self, e:ft.TapEvent):
+    async def b_add_choices_lote_clicked(self, e:ft.TapEvent):
         if self.tf_new_choices_lote.value:
             lote = self.tf_new_choices_lote.value.split(
                 self.tf_choices_split.value if self.tf_choices_split.value else " "
             )
-            self.controller.add_choices(lote)
+            await self.controller.add_choices_async(lote)
             self.reload_choices_list()
             self.close_dialog(self)
\ No newline at end of file
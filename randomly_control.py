@@ -1,10 +1,60 @@
+import asyncio
+import functools
+import itertools
 import math
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from randomly_audit import RlyAuditLog, RLY_AUDIT
+from randomly_session import RlyDrawSession, RLY_SESSION
+from randomly_history import RlyNumbersHistory, RlyChoicesHistory
+from randomly_solver import RlyGroupingSolver, RlyPickSet
+from randomly_tournament import RlyBracket
+from randomly_exclusions import RlyExclusionSets, RlyRankSelect
+from randomly_workspaces import RlyWorkspace
+from randomly_edits import RlyEdit, RlyEditJournal, EDIT_ADD, EDIT_EDIT, EDIT_REMOVE
+
+# worker of the async operations of all the controllers, they run in the order they're called
+RLY_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="randomly-controller")
+# held by every draw and edition of the controllers, from the executor or from the threads of the sync
+# event handlers: the controllers share the session generator and journal, so they never overlap
+RLY_LOCK = threading.RLock()
+# cycles drawn by 'generate_derangement' before giving up (not journaled, replays use the same number)
+DERANGEMENT_RESTARTS = 8
+
+def locked(method):
+    """Run a controller method holding 'RLY_LOCK'."""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with RLY_LOCK:
+            return method(*args, **kwargs)
+    return wrapper
 
 class RlyController:
 
-    def __init__(self):
+    # name of the random generator saved in the audit log
+    rng_backend = "random.Random (MT19937)"
+    # operations made of several controller calls (workspace switches) hold it too
+    lock = RLY_LOCK
+
+    def __init__(self, audit:RlyAuditLog=None, session:RlyDrawSession=None):
         self.last_result = None
+        # the app audit log and draw session are used if none is given (they're None when disabled)
+        self.audit = audit if audit is not None else RLY_AUDIT
+        self.session = session if session is not None else RLY_SESSION
+        # draws use the seeded generator of the session, or the global one of the random module
+        self.rng = self.session.rng if self.session is not None else random
+
+    def run_async(self, method, *args, **kwargs):
+        """Run a controller method in 'RLY_EXECUTOR' and return an awaitable of its result, so the
+        event loop of the app keeps handling events while it runs."""
+        return asyncio.get_running_loop().run_in_executor(RLY_EXECUTOR, functools.partial(method, *args, **kwargs))
+
+    def record_error(self, method:str, arguments:dict, error:Exception):
+        # a draw that fails may have used the generator already: it's journaled with its error, so
+        # the replay fails the same way and the next draws take the same values
+        if self.session is not None:
+            self.session.record_call(method, arguments, {"error": str(error)})
 
     def result_size(self):
         result_size = 40
@@ -17,51 +67,600 @@ class RlyController:
 
 class RlyNumbersController(RlyController):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, audit:RlyAuditLog=None, session:RlyDrawSession=None):
+        super().__init__(audit=audit, session=session)
         self.min_limit = 0
         self.max_limit = 100
+        self.history = RlyNumbersHistory()
 
+    @locked
     def generate_result(self, limit_1:int, limit_2:int):
 
         self.min_limit = min(limit_1, limit_2)
         self.max_limit = max(limit_1, limit_2)
-        self.last_result = random.randint(a=self.min_limit, b=self.max_limit)
+        self.last_result = self.rng.randint(a=self.min_limit, b=self.max_limit)
+        if self.session is not None:
+            self.session.record_draw_numbers(limit_1, limit_2, self.last_result)
+        self.history.add(
+            self.last_result, setup=(self.min_limit, self.max_limit), candidates=self.max_limit - self.min_limit + 1
+        )
+        if self.audit is not None:
+            self.audit.record(
+                controller="numbers",
+                min_limit=self.min_limit,
+                max_limit=self.max_limit,
+                candidates=self.max_limit - self.min_limit + 1,
+                rng=self.rng_backend,
+                result=self.last_result
+            )
         return self.last_result
 
+    async def generate_result_async(self, limit_1:int, limit_2:int):
+        return await self.run_async(self.generate_result, limit_1, limit_2)
+
 class RlyChoicesController(RlyController):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, audit:RlyAuditLog=None, session:RlyDrawSession=None):
+        super().__init__(audit=audit, session=session)
         self.choices:list[str] = []
         self.choices_listed = False
+        self.history = RlyChoicesHistory()
+        # tags of each choice, and choices of each tag (for stratified draws)
+        self.tags:dict[str, set[str]] = {}
+        self.tag_index:dict[str, RlyPickSet] = {}
+        # named exclusion sets, and the last rank/select built from them: (key, RlyRankSelect)
+        self.exclusions = RlyExclusionSets()
+        self.rank_select = None
+        # undo/redo of the editions of the choices list
+        self.edits = RlyEditJournal()
+        # workspace whose store (the fields above) is in use, see 'randomly_workspaces.RlyWorkspaces'
+        self.workspace = None
 
-    def generate_result(self, filter:str=None):
+    @locked
+    def generate_result(self, filter:str=None, exclude:list[str]=None):
 
+        if exclude:
+            return self.generate_excluded_result(filter=filter, exclude=exclude)
         if filter is not None:
             tmp_choices = [choice for choice in self.choices if choice.startswith(filter)]
             if tmp_choices:
-                self.last_result = random.choice(tmp_choices)
+                self.last_result = self.rng.choice(tmp_choices)
         else:
+            tmp_choices = self.choices
             if self.choices:
-                self.last_result = random.choice(self.choices)
+                self.last_result = self.rng.choice(self.choices)
+        if self.session is not None:
+            self.session.record_draw_choice(filter, self.last_result)
+        if tmp_choices:
+            self.history.add(self.last_result, setup=(filter, len(tmp_choices)), candidates=len(tmp_choices))
+        if self.audit is not None and tmp_choices:
+            self.audit.record(
+                controller="choices",
+                filter=filter,
+                candidates=len(tmp_choices),
+                rng=self.rng_backend,
+                result=self.last_result
+            )
         return self.last_result
     
+    @locked
+    def generate_excluded_result(self, filter:str=None, exclude:list[str]=None):
+        """Draw between the choices not in the exclusion sets named in 'exclude'. Without filter the
+        result is selected with a rank/select of the exclusions, O(log n) and without copying the choices
+        (the rank/select is built again only when the sets or the choices change)."""
+        key = (tuple(exclude), self.exclusions.version, len(self.choices))
+        if self.rank_select is None or self.rank_select[0] != key:
+            self.rank_select = (key, RlyRankSelect(self.exclusions.mask(exclude), len(self.choices)))
+        rank_select = self.rank_select[1]
+        if filter is None:
+            candidates = rank_select.count
+            if candidates:
+                self.last_result = self.choices[rank_select.select(self.rng.randrange(candidates))]
+        else:
+            tmp_choices = [
+                choice for index, choice in enumerate(self.choices) if choice.startswith(filter) and rank_select.is_allowed(index)
+            ]
+            candidates = len(tmp_choices)
+            if tmp_choices:
+                self.last_result = self.rng.choice(tmp_choices)
+        if self.session is not None:
+            self.session.record_call("generate_result", {"filter": filter, "exclude": list(exclude)}, self.last_result)
+        if candidates:
+            self.history.add(self.last_result, setup=(filter, tuple(exclude), candidates), candidates=candidates)
+        if self.audit is not None and candidates:
+            self.audit.record(
+                controller="choices",
+                filter=filter,
+                exclude=list(exclude),
+                candidates=candidates,
+                rng=self.rng_backend,
+                result=self.last_result
+            )
+        return self.last_result
+
+    @locked
+    def exclude_choices(self, name:str, choices:list[str]):
+        """Add choices to the exclusion set 'name' (it's created if it doesn't exist)."""
+        indexes = {choice: index for index, choice in enumerate(self.choices)}
+        choices = [choice for choice in choices if choice in indexes]
+        if self.session is not None:
+            self.session.record_state_call("exclude_choices", {"name": name, "choices": choices})
+        self.exclusions.exclude(name, [indexes[choice] for choice in choices])
+
+    @locked
+    def include_choices(self, name:str, choices:list[str]):
+        """Take choices out of the exclusion set 'name'."""
+        indexes = {choice: index for index, choice in enumerate(self.choices)}
+        choices = [choice for choice in choices if choice in indexes]
+        if self.session is not None:
+            self.session.record_state_call("include_choices", {"name": name, "choices": choices})
+        self.exclusions.include(name, [indexes[choice] for choice in choices])
+
+    @locked
+    def delete_exclusion(self, name:str):
+        if self.session is not None:
+            self.session.record_state_call("delete_exclusion", {"name": name})
+        self.exclusions.delete(name)
+
+    @locked
+    def excluded_choices(self, name:str):
+        bits = self.exclusions.sets.get(name, 0)
+        return [choice for index, choice in enumerate(self.choices) if bits >> index & 1] if bits else []
+
+    @locked
+    def split_groups(self, groups:int, seed:int=None):
+        """Shuffle the choices once (O(n)) and return a generator of 'groups' groups whose sizes
+        differ at most by one. With a 'seed' the split is made with its own generator and can be repeated."""
+        if groups < 1:
+            raise ValueError("The number of groups must be 1 or more")
+        rng = random.Random(seed) if seed is not None else self.rng
+        shuffled = self.choices[:]
+        rng.shuffle(shuffled)
+        if self.session is not None:
+            self.session.record_split_groups(groups, seed, shuffled)
+        if self.audit is not None:
+            self.audit.record(
+                controller="groups",
+                groups=groups,
+                seed=seed,
+                candidates=len(shuffled),
+                rng=self.rng_backend,
+                result=shuffled
+            )
+        return self.iter_groups(shuffled, groups)
+
+    def iter_groups(self, shuffled:list[str], groups:int):
+        # the first 'extra' groups take one more choice
+        size, extra = divmod(len(shuffled), groups)
+        start = 0
+        for group in range(groups):
+            end = start + size + (1 if group < extra else 0)
+            yield shuffled[start:end]
+            start = end
+
+    @locked
+    def generate_derangement(self, forbidden:list[tuple[str, str]]=None, mutual:bool=True, seed:int=None):
+        """Return a list of (giver, receiver) pairs, in the order of the choices, where no choice is
+        paired with itself and all the choices make a single cycle (Sattolo's algorithm, O(n)).
+        Pairs in 'forbidden' (in both directions if 'mutual') are repaired by moving one of their choices
+        to another place of the cycle. A new cycle is drawn only if the repair runs out of moves, raise
+        ValueError if the forbidden pairs can't be avoided after DERANGEMENT_RESTARTS cycles."""
+        count = len(self.choices)
+        if count < 2:
+            raise ValueError("At least 2 choices are needed")
+        rng = random.Random(seed) if seed is not None else self.rng
+        indexes = {choice: index for index, choice in enumerate(self.choices)}
+        banned = set()
+        for giver, receiver in forbidden or ():
+            if giver in indexes and receiver in indexes:
+                banned.add((indexes[giver], indexes[receiver]))
+                if mutual:
+                    banned.add((indexes[receiver], indexes[giver]))
+
+        try:
+            after = self.draw_cycle(count, banned, rng)
+        except ValueError as error:
+            self.record_error("generate_derangement", {"forbidden": forbidden or [], "mutual": mutual, "seed": seed}, error)
+            raise
+
+        pairs = [(self.choices[i], self.choices[after[i]]) for i in range(count)]
+        if self.session is not None:
+            self.session.record_derangement(forbidden or [], mutual, seed, [receiver for giver, receiver in pairs])
+        if self.audit is not None:
+            self.audit.record(
+                controller="derangement",
+                # the record is written later by the audit thread, it keeps immutable copies and not the returned list
+                forbidden=tuple(tuple(pair) for pair in forbidden or ()),
+                mutual=mutual,
+                seed=seed,
+                candidates=count,
+                rng=self.rng_backend,
+                result=tuple(pairs)
+            )
+        return pairs
+
+    def draw_cycle(self, count:int, banned:set[tuple[int, int]], rng:random.Random):
+        for attempt in range(DERANGEMENT_RESTARTS):
+            # Sattolo: swapping only with earlier positions gives a random cyclic permutation
+            after = list(range(count))
+            for i in range(count - 1, 0, -1):
+                j = rng.randrange(i)
+                after[i], after[j] = after[j], after[i]
+            if not banned:
+                return after
+            try:
+                self.repair_cycle(after, banned, rng)
+                return after
+            except ValueError:
+                # small lists with many forbidden pairs can leave the repair without moves, a new cycle is drawn
+                if attempt == DERANGEMENT_RESTARTS - 1:
+                    raise
+
+    def repair_cycle(self, after:list[int], banned:set[tuple[int, int]], rng:random.Random, probes:int=32):
+        # 'after' is the next element of each element in the cycle. A banned link a -> b is removed moving
+        # b (or a) between two other linked elements m -> n, which changes only three links and keeps one cycle
+        count = len(after)
+        before = [0] * count
+        for i in range(count):
+            before[after[i]] = i
+
+        def allowed(giver:int, receiver:int):
+            return giver != receiver and (giver, receiver) not in banned
+
+        def place(moved:int):
+            # links left when 'moved' is taken out of the cycle
+            if not allowed(before[moved], after[moved]):
+                return False
+            start = int(rng.random() * count)
+            candidates = (int(rng.random() * count) for i in range(probes))
+            for m in itertools.chain(candidates, ((start + i) % count for i in range(count))):
+                n = after[m]
+                if m != moved and n != moved and allowed(m, moved) and allowed(moved, n):
+                    after[before[moved]] = after[moved]
+                    before[after[moved]] = before[moved]
+                    after[m] = moved
+                    before[moved] = m
+                    after[moved] = n
+                    before[n] = moved
+                    return True
+            return False
+
+        for giver in [i for i in range(count) if (i, after[i]) in banned]:
+            for attempt in range(probes):
+                # the link could have been fixed by a previous move
+                if (giver, after[giver]) not in banned or place(after[giver]) or place(giver):
+                    break
+                # both ways out close a forbidden link: a neighbor is moved first to change them
+                place(after[after[giver]] if attempt % 2 == 0 else before[giver])
+            else:
+                raise ValueError(f"The forbidden pair ({self.choices[giver]}, {self.choices[after[giver]]}) can't be avoided")
+
+    @locked
+    def solve_groups(self, groups:int, separate:list[list[str]]=None, spread:dict[str, str]=None, seed:int=None,
+                     max_steps:int=None):
+        """Return the choices split in 'groups' groups of balanced sizes where the choices of each list
+        of 'separate' are in different groups and the categories of 'spread' ({choice: category}) are
+        evenly spread. See 'randomly_solver.RlyGroupingSolver'."""
+        rng = random.Random(seed) if seed is not None else self.rng
+        arguments = {"groups": groups, "separate": separate, "spread": spread, "seed": seed, "max_steps": max_steps}
+        try:
+            result = RlyGroupingSolver(self.choices, groups, separate=separate, spread=spread, rng=rng).solve(max_steps)
+        except ValueError as error:
+            self.record_error("solve_groups", arguments, error)
+            raise
+        if self.session is not None:
+            self.session.record_call("solve_groups", arguments, result)
+        if self.audit is not None:
+            # the record is written later by the audit thread, it keeps immutable copies and not the returned lists
+            self.audit.record(
+                controller="solve_groups",
+                groups=groups,
+                separate=tuple(tuple(members) for members in separate) if separate is not None else None,
+                spread=dict(spread) if spread is not None else None,
+                seed=seed,
+                max_steps=max_steps,
+                candidates=len(self.choices),
+                rng=self.rng_backend,
+                result=tuple(tuple(group) for group in result)
+            )
+        return result
+
+    @locked
+    def generate_bracket(self, mode:str="single", seed:int=None):
+        """Return a 'randomly_tournament.RlyBracket' ("single", "double" or "round_robin") between
+        the choices, seeded in a random order. Its rounds are generated when they're iterated."""
+        rng = random.Random(seed) if seed is not None else self.rng
+        entrants = self.choices[:]
+        rng.shuffle(entrants)
+        try:
+            bracket = RlyBracket(entrants, mode=mode)
+        except ValueError as error:
+            self.record_error("generate_bracket", {"mode": mode, "seed": seed}, error)
+            raise
+        if self.session is not None:
+            self.session.record_call("generate_bracket", {"mode": mode, "seed": seed}, bracket)
+        if self.audit is not None:
+            # the bracket keeps the entrants list, the record written later by the audit thread keeps a tuple
+            self.audit.record(
+                controller="bracket", mode=mode, seed=seed, candidates=len(entrants), rng=self.rng_backend, result=tuple(entrants)
+            )
+        return bracket
+
+    @locked
+    def generate_stratified(self, winners:int=None, quotas:dict[str, int]=None, strata:list[str]=None, seed:int=None):
+        """Draw winners from the choices of each tag (stratum) and return {tag: [winners]}.
+        With 'winners' they're allocated proportionally to the size of every stratum (largest remainders),
+        with 'quotas' ({tag: winners}) every stratum has a fixed number. 'strata' limits the tags used
+        (default: all of them). A choice with several tags is drawn once at most.
+        Every stratum is sampled from the tag index in O(its winners), the choices list isn't filtered."""
+        rng = random.Random(seed) if seed is not None else self.rng
+        arguments = {"winners": winners, "quotas": quotas, "strata": strata, "seed": seed}
+        try:
+            if quotas is None:
+                strata = sorted(self.tag_index) if strata is None else [tag for tag in strata if tag in self.tag_index]
+                quotas = self.allocate_quotas(winners or 0, strata, rng)
+            drawn = set()
+            result = {}
+            for tag, quota in quotas.items():
+                pool = self.tag_index[tag].items if tag in self.tag_index else []
+                result[tag] = self.sample_stratum(pool, quota, drawn, rng)
+        except ValueError as error:
+            self.record_error("generate_stratified", arguments, error)
+            raise
+        if self.session is not None:
+            self.session.record_call("generate_stratified", arguments, result)
+        if self.audit is not None:
+            self.audit.record(
+                controller="stratified",
+                quotas=dict(quotas),
+                seed=seed,
+                candidates=sum(len(self.tag_index[tag]) for tag in quotas if tag in self.tag_index),
+                rng=self.rng_backend,
+                result={tag: list(winners) for tag, winners in result.items()}
+            )
+        return result
+
+    def allocate_quotas(self, winners:int, strata:list[str], rng:random.Random):
+        # Hamilton method: floor of the proportional share, the rest to the largest remainders (ties at random)
+        sizes = {tag: len(self.tag_index[tag]) for tag in strata}
+        total = sum(sizes.values())
+        winners = min(winners, total)
+        if not total:
+            return {tag: 0 for tag in strata}
+        quotas = {tag: winners * size // total for tag, size in sizes.items()}
+        remainders = sorted(strata, key=lambda tag: (winners * sizes[tag] % total, rng.random()), reverse=True)
+        for tag in remainders[:winners - sum(quotas.values())]:
+            quotas[tag] += 1
+        return quotas
+
+    def sample_stratum(self, pool:list[str], quota:int, drawn:set[str], rng:random.Random):
+        # random picks rejecting the repeated ones, O(quota) while the stratum is far from exhausted
+        winners = []
+        if quota * 2 <= len(pool):
+            attempts = 0
+            while len(winners) < quota and attempts < 4 * quota + 16:
+                attempts += 1
+                choice = pool[int(rng.random() * len(pool))]
+                if choice not in drawn:
+                    drawn.add(choice)
+                    winners.append(choice)
+        if len(winners) < quota:
+            # big quotas (or choices drawn in other strata): sample from the choices not drawn yet
+            available = [choice for choice in pool if choice not in drawn]
+            extra = rng.sample(available, min(quota - len(winners), len(available)))
+            drawn.update(extra)
+            winners.extend(extra)
+        return winners
+
+    @locked
+    def tag_choice(self, choice:str, tags:list[str]):
+        """Add tags (department, region...) to a choice."""
+        self.tag_choices({choice: tags})
+
+    @locked
+    def tag_choices(self, tags:dict[str, list[str]]):
+        """Add tags to many choices at once ({choice: tags}). Choices not in the list are ignored."""
+        choices = set(self.choices)
+        tags = {choice: list(choice_tags) for choice, choice_tags in tags.items() if choice in choices}
+        if self.session is not None:
+            self.session.record_state_call("tag_choices", {"tags": tags})
+        for choice, new_tags in tags.items():
+            choice_tags = self.tags.setdefault(choice, set())
+            for tag in new_tags:
+                if tag not in choice_tags:
+                    choice_tags.add(tag)
+                    self.tag_index.setdefault(tag, RlyPickSet()).add(choice)
+
+    @locked
+    def untag_choice(self, choice:str, tags:list[str]=None):
+        """Remove tags of a choice (all of them if 'tags' is None)."""
+        if self.session is not None:
+            self.session.record_state_call("untag_choice", {"choice": choice, "tags": list(tags) if tags is not None else None})
+        choice_tags = self.tags.get(choice, set())
+        for tag in list(choice_tags) if tags is None else tags:
+            if tag in choice_tags:
+                choice_tags.discard(tag)
+                self.tag_index[tag].discard(choice)
+                if not self.tag_index[tag]:
+                    del self.tag_index[tag]
+        if not choice_tags:
+            self.tags.pop(choice, None)
+
+    @locked
+    def use_workspace(self, workspace:RlyWorkspace):
+        """Draw from the choices and indexes of 'workspace', O(1): only the references are changed."""
+        if self.session is not None:
+            # the replay has no workspaces on disk, so the content of the workspace is journaled
+            self.session.record_state_call("restore_workspace", {"name": workspace.name, **workspace.to_json()})
+        self.workspace = workspace
+        self.choices = workspace.choices
+        self.history = workspace.history
+        self.tags = workspace.tags
+        self.tag_index = workspace.tag_index
+        self.exclusions = workspace.exclusions
+        self.rank_select = workspace.rank_select
+        self.edits = workspace.edits
+
+    @locked
+    def store_workspace(self):
+        # the lists of the controller can be replaced (add_choices...), the workspace keeps the current ones
+        workspace = self.workspace
+        workspace.choices = self.choices
+        workspace.history = self.history
+        workspace.tags = self.tags
+        workspace.tag_index = self.tag_index
+        workspace.exclusions = self.exclusions
+        workspace.rank_select = self.rank_select
+        workspace.edits = self.edits
+
+    @locked
+    def restore_workspace(self, name:str, choices:list[str], tags:dict[str, list[str]], exclusions:dict[str, str]):
+        self.use_workspace(RlyWorkspace(name, choices=choices, tags=tags, exclusions=exclusions))
+
+    @locked
     def add_choice(self, choice:str):
+        if self.session is not None:
+            self.session.record_add_choice(choice)
         if choice and not choice in self.choices:
-            self.choices = self.choices + [choice]
+            self.edits.push(RlyEdit(EDIT_ADD, len(self.choices)))
+            self.choices.append(choice)
             return True
         return False
 
+    @locked
     def add_choices(self, choices:list[str]):
-        new_choices = [choice.replace("\n","") for choice in choices if choice not in self.choices]
-        self.choices = self.choices + new_choices
+        if self.session is not None:
+            self.session.record_add_choices(choices)
+        existing = set(self.choices)
+        new_choices = [choice.replace("\n","") for choice in choices if choice not in existing]
+        if new_choices:
+            # the journal keeps the range of the lote, not its choices
+            self.edits.push(RlyEdit(EDIT_ADD, len(self.choices), count=len(new_choices)))
+            self.choices.extend(new_choices)
     
+    @locked
     def edit_choice(self, old:str, new:str):
         choice_index = self.choices.index(old)
         self.choices[choice_index] = new
+        if self.session is not None:
+            self.session.record_edit_choice(old, new)
+        self.edits.push(RlyEdit(EDIT_EDIT, choice_index, choices=[old, new]))
+        self.move_tags(old, new)
     
+    @locked
     def remove_choice(self, choice:str):
-        self.choices.remove(choice)
+        choice_index = self.choices.index(choice)
+        del self.choices[choice_index]
+        exclusions = None
+        if self.exclusions.sets:
+            exclusions = [name for name, bits in self.exclusions.sets.items() if bits >> choice_index & 1]
+            # exclusion bitsets follow the indexes of the list
+            self.exclusions.remove_index(choice_index)
+        if self.session is not None:
+            self.session.record_remove_choice(choice)
+        tags = self.pop_tags([choice])
+        self.edits.push(RlyEdit(EDIT_REMOVE, choice_index, choices=[choice], tags=tags, exclusions=exclusions))
+
+    @locked
+    def undo(self):
+        """Undo the last edition of the choices list, in the time of its delta. Return False if there is nothing to undo."""
+        if not self.edits.can_undo():
+            return False
+        if self.session is not None:
+            self.session.record_state_call("undo", {})
+        edit = self.edits.pop_undo()
+        if edit.operation == EDIT_ADD:
+            # the added choices are still the last ones of the list, they're kept to be added again
+            edit.choices = self.choices[edit.index:edit.index + edit.count]
+            del self.choices[edit.index:]
+            edit.tags = self.pop_tags(edit.choices)
+            edit.exclusions = self.exclusions.split(edit.index) if self.exclusions.sets else None
+        elif edit.operation == EDIT_EDIT:
+            old, new = edit.choices
+            self.choices[edit.index] = old
+            self.move_tags(new, old)
+        else:
+            self.choices.insert(edit.index, edit.choices[0])
+            self.push_tags(edit.tags)
+            if self.exclusions.sets or edit.exclusions:
+                self.exclusions.insert_index(edit.index, edit.exclusions or [])
+        self.edits.push_redo(edit)
+        return True
+
+    @locked
+    def redo(self):
+        """Do again the last undone edition. Return False if there is nothing to redo."""
+        if not self.edits.can_redo():
+            return False
+        if self.session is not None:
+            self.session.record_state_call("redo", {})
+        edit = self.edits.pop_redo()
+        if edit.operation == EDIT_ADD:
+            self.choices.extend(edit.choices)
+            self.push_tags(edit.tags)
+            if edit.exclusions:
+                self.exclusions.join(edit.index, edit.exclusions)
+            edit.choices = edit.tags = edit.exclusions = None
+        elif edit.operation == EDIT_EDIT:
+            old, new = edit.choices
+            self.choices[edit.index] = new
+            self.move_tags(old, new)
+        else:
+            del self.choices[edit.index]
+            if self.exclusions.sets:
+                self.exclusions.remove_index(edit.index)
+            self.pop_tags(edit.choices)
+        self.edits.push_undo(edit)
+        return True
+
+    def move_tags(self, old:str, new:str):
+        # an edited choice keeps its tags
+        old_tags = self.tags.pop(old, None)
+        if old_tags:
+            for tag in old_tags:
+                self.tag_index[tag].discard(old)
+                self.tag_index[tag].add(new)
+            self.tags[new] = old_tags
+
+    def pop_tags(self, choices:list[str]):
+        """Remove the tags of 'choices' and return them ({choice: tags}), or None if they had no tags."""
+        if not self.tags:
+            return None
+        removed = {}
+        for choice in choices:
+            choice_tags = self.tags.pop(choice, None)
+            if choice_tags:
+                removed[choice] = choice_tags
+                for tag in choice_tags:
+                    self.tag_index[tag].discard(choice)
+                    if not self.tag_index[tag]:
+                        del self.tag_index[tag]
+        return removed or None
+
+    def push_tags(self, tags:dict[str, set[str]]):
+        for choice, choice_tags in (tags or {}).items():
+            self.tags[choice] = choice_tags
+            for tag in choice_tags:
+                self.tag_index.setdefault(tag, RlyPickSet()).add(choice)
+
+    # METODOS ASINCRONOS
+    async def generate_result_async(self, filter:str=None, exclude:list[str]=None):
+        return await self.run_async(self.generate_result, filter=filter, exclude=exclude)
+
+    async def add_choice_async(self, choice:str):
+        return await self.run_async(self.add_choice, choice)
+
+    async def add_choices_async(self, choices:list[str]):
+        return await self.run_async(self.add_choices, choices)
+
+    async def edit_choice_async(self, old:str, new:str):
+        return await self.run_async(self.edit_choice, old=old, new=new)
+
+    async def remove_choice_async(self, choice:str):
+        return await self.run_async(self.remove_choice, choice)
+
+    async def undo_async(self):
+        return await self.run_async(self.undo)
 
- 
+    async def redo_async(self):
+        return await self.run_async(self.redo)
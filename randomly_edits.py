@@ -0,0 +1,96 @@
+from collections import deque
+
+# operations of the edit journal
+EDIT_ADD = 1
+EDIT_EDIT = 2
+EDIT_REMOVE = 3
+# approximate bytes of a journal entry and of each string reference kept by an entry
+ENTRY_BYTES = 64
+REFERENCE_BYTES = 8
+
+class RlyEdit:
+    """Delta of a choices list edition, the inverse operation is enough to undo or redo it:\n
+    ---
+    - EDIT_ADD: choices appended at 'index'. While the choices are in the list 'choices' is None, once
+    undone it keeps the removed slice (references to the same strings) to add them again.
+    - EDIT_EDIT: choice at 'index' changed from choices[0] to choices[1].
+    - EDIT_REMOVE: choices[0] removed from 'index', with its tags and the names of the exclusion sets it was in.
+    """
+    __slots__ = ("operation", "index", "count", "choices", "tags", "exclusions", "size")
+
+    def __init__(self, operation:int, index:int, count:int=1, choices:list[str]=None, tags:dict[str, set[str]]=None,
+                 exclusions:list[str]=None):
+        self.operation = operation
+        self.index = index
+        self.count = count
+        self.choices = choices
+        self.tags = tags
+        self.exclusions = exclusions
+        self.size = 0
+        self.measure()
+
+    def measure(self):
+        # the strings of the choices list aren't copied, only the ones kept by the entry alone are counted
+        size = ENTRY_BYTES
+        if self.choices is not None:
+            size += sum(REFERENCE_BYTES + len(choice) for choice in self.choices)
+        if self.tags:
+            size += sum(REFERENCE_BYTES * (1 + len(tags)) for tags in self.tags.values())
+        if self.exclusions:
+            size += REFERENCE_BYTES * len(self.exclusions)
+        self.size = size
+
+class RlyEditJournal:
+    """Undo and redo stacks of the editions of a choices list, limited to 'max_bytes' (the oldest
+    undo entries are dropped first). Undoing or redoing costs the size of its delta, not of the list.
+    """
+    def __init__(self, max_bytes:int=16 * 2**20):
+        self.max_bytes = max_bytes
+        self.undo_stack:deque[RlyEdit] = deque()
+        self.redo_stack:list[RlyEdit] = []
+        self.size = 0
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def push(self, edit:RlyEdit):
+        """Save a new edition, the undone ones can't be redone anymore."""
+        for old in self.redo_stack:
+            self.size -= old.size
+        self.redo_stack.clear()
+        self.undo_stack.append(edit)
+        self.size += edit.size
+        self.trim()
+
+    def pop_undo(self):
+        edit = self.undo_stack.pop()
+        self.size -= edit.size
+        return edit
+
+    def pop_redo(self):
+        edit = self.redo_stack.pop()
+        self.size -= edit.size
+        return edit
+
+    def push_undo(self, edit:RlyEdit):
+        # a redone edition, it keeps the redo stack
+        edit.measure()
+        self.undo_stack.append(edit)
+        self.size += edit.size
+        self.trim()
+
+    def push_redo(self, edit:RlyEdit):
+        edit.measure()
+        self.redo_stack.append(edit)
+        self.size += edit.size
+        self.trim()
+
+    def trim(self):
+        while self.size > self.max_bytes and self.undo_stack:
+            self.size -= self.undo_stack.popleft().size
+        # a single redo delta bigger than the limit isn't kept either
+        while self.size > self.max_bytes and self.redo_stack:
+            self.size -= self.redo_stack.pop(0).size
@@ -0,0 +1,146 @@
+BLOCK_BITS = 1024
+BLOCK_BYTES = BLOCK_BITS // 8
+
+def bitset(indexes:list[int]):
+    """Int with the bits of 'indexes' set, built in O(n) through a bytearray."""
+    indexes = list(indexes)
+    if not indexes:
+        return 0
+    data = bytearray(max(indexes) // 8 + 1)
+    for index in indexes:
+        data[index >> 3] |= 1 << (index & 7)
+    return int.from_bytes(data, "little")
+
+class RlyExclusionSets:
+    """Named sets of excluded choices (previous winners, staff...). Every set is a bitset over the
+    indexes of the choices list, kept in a python int, so unions and removals work on machine words
+    and excluding 100k choices doesn't copy the list.
+    """
+    def __init__(self):
+        self.sets:dict[str, int] = {}
+        # incremented on every change, to know when a 'RlyRankSelect' built from the sets is old
+        self.version = 0
+
+    def names(self):
+        return list(self.sets)
+
+    def exclude(self, name:str, indexes:list[int]):
+        self.sets[name] = self.sets.get(name, 0) | bitset(indexes)
+        self.version += 1
+
+    def include(self, name:str, indexes:list[int]):
+        self.sets[name] = self.sets.get(name, 0) & ~bitset(indexes)
+        self.version += 1
+
+    def delete(self, name:str):
+        if self.sets.pop(name, None) is not None:
+            self.version += 1
+
+    def count(self, name:str):
+        return self.sets.get(name, 0).bit_count()
+
+    def mask(self, names:list[str]):
+        """Union of the given sets."""
+        mask = 0
+        for name in names:
+            mask |= self.sets.get(name, 0)
+        return mask
+
+    def remove_index(self, index:int):
+        """Remove the bit of a deleted choice and move down the next ones, like the choices list does."""
+        low = (1 << index) - 1
+        for name, bits in self.sets.items():
+            self.sets[name] = (bits & low) | ((bits >> (index + 1)) << index)
+        self.version += 1
+
+    def insert_index(self, index:int, names:list[str]):
+        """Inverse of 'remove_index': move up the bits from 'index' and set it in the sets 'names'."""
+        low = (1 << index) - 1
+        for name, bits in self.sets.items():
+            self.sets[name] = (bits & low) | ((bits >> index) << (index + 1))
+        for name in names:
+            self.sets[name] = self.sets.get(name, 0) | (1 << index)
+        self.version += 1
+
+    def split(self, index:int):
+        """Remove the bits from 'index' on (choices removed from the end of the list) and return them by set."""
+        removed = {}
+        low = (1 << index) - 1
+        for name, bits in self.sets.items():
+            if bits >> index:
+                removed[name] = bits >> index
+                self.sets[name] = bits & low
+        self.version += 1
+        return removed
+
+    def join(self, index:int, removed:dict[str, int]):
+        """Inverse of 'split'."""
+        for name, bits in removed.items():
+            self.sets[name] = self.sets.get(name, 0) | (bits << index)
+        self.version += 1
+
+class RlyRankSelect:
+    """Rank/select over the zeros (allowed choices) of an exclusion mask of 'size' bits.
+    The mask is split in blocks of 1024 bits with a Fenwick tree of their allowed counts, so
+    'select' finds the block in O(log n) and the bit inside it with a binary search of popcounts.
+    """
+    def __init__(self, mask:int, size:int):
+        self.size = size
+        data = (mask & ((1 << size) - 1)).to_bytes(max(1, -(-size // 8)), "little")
+        blocks = -(-size // BLOCK_BITS)
+        self.blocks = []
+        counts = []
+        for block in range(blocks):
+            bits = int.from_bytes(data[block * BLOCK_BYTES:(block + 1) * BLOCK_BYTES], "little")
+            width = min(BLOCK_BITS, size - block * BLOCK_BITS)
+            allowed = ~bits & ((1 << width) - 1)
+            self.blocks.append(allowed)
+            counts.append(allowed.bit_count())
+        self.count = sum(counts)
+        # Fenwick tree (1-based) of the allowed counts
+        self.tree = [0] + counts
+        for i in range(1, blocks + 1):
+            parent = i + (i & -i)
+            if parent <= blocks:
+                self.tree[parent] += self.tree[i]
+        self.top = 1 << blocks.bit_length() if blocks else 0
+
+    def rank(self, index:int):
+        """Number of allowed positions before 'index'."""
+        block, offset = divmod(index, BLOCK_BITS)
+        total = 0
+        i = block
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        if block < len(self.blocks):
+            total += (self.blocks[block] & ((1 << offset) - 1)).bit_count()
+        return total
+
+    def select(self, k:int):
+        """Index of the k-th (from 0) allowed position."""
+        if not 0 <= k < self.count:
+            raise IndexError("select out of range")
+        # Fenwick descent: last block whose prefix count is <= k
+        block = 0
+        step = self.top
+        while step:
+            following = block + step
+            if following < len(self.tree) and self.tree[following] <= k:
+                block = following
+                k -= self.tree[following]
+            step >>= 1
+        # binary search of the bit with k allowed bits before it
+        allowed = self.blocks[block]
+        low, high = 0, BLOCK_BITS - 1
+        while low < high:
+            middle = (low + high) // 2
+            if (allowed & ((2 << middle) - 1)).bit_count() > k:
+                high = middle
+            else:
+                low = middle + 1
+        return block * BLOCK_BITS + low
+
+    def is_allowed(self, index:int):
+        block, offset = divmod(index, BLOCK_BITS)
+        return bool(self.blocks[block] >> offset & 1)
@@ -0,0 +1,196 @@
+from array import array
+
+class RlyHistory:
+    """Ring buffer with the last results of a controller. The statistics are updated when a result
+    is added or falls out of the buffer, so they're read in O(1) without going over the history.
+    Statistics count only the draws made with the current setup (limits, filter and number of
+    candidates): when the setup changes the buffer keeps the old results but statistics start again.
+    """
+    def __init__(self, capacity:int=1000):
+        self.capacity = capacity
+        self.ring = self.new_ring()
+        self.total = 0
+        self.setup = None
+        self.setup_start = 0
+        self.candidates = 0
+        self.counts:dict = {}
+        self.counts_squares = 0
+
+    def new_ring(self):
+        return [None] * self.capacity
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def recent(self, number:int=None):
+        """Return the last results, from the newest to the oldest."""
+        number = len(self) if number is None else min(number, len(self))
+        return [self.decode(self.ring[(self.total - 1 - i) % self.capacity]) for i in range(number)]
+
+    def decode(self, item):
+        return item
+
+    def add(self, result, setup, candidates:int):
+        """Add the result of a draw made with 'setup' between 'candidates' possible results."""
+        if setup != self.setup:
+            self.restart(setup=setup, candidates=candidates)
+        if self.total >= self.capacity:
+            if self.total - self.capacity >= self.setup_start:
+                self.discount(self.ring[self.total % self.capacity])
+        item = self.encode(result)
+        self.ring[self.total % self.capacity] = item
+        self.total += 1
+        self.count(item)
+
+    def encode(self, result):
+        return result
+
+    def restart(self, setup, candidates:int):
+        self.setup = setup
+        self.setup_start = self.total
+        self.candidates = candidates
+        self.counts = {}
+        self.counts_squares = 0
+
+    def count(self, item):
+        key = self.key(item)
+        count = self.counts.get(key, 0)
+        self.counts[key] = count + 1
+        # sum of squared counts: (c + 1)^2 - c^2 = 2c + 1
+        self.counts_squares += 2 * count + 1
+
+    def discount(self, item):
+        key = self.key(item)
+        count = self.counts[key]
+        if count == 1:
+            del self.counts[key]
+        else:
+            self.counts[key] = count - 1
+        self.counts_squares -= 2 * count - 1
+
+    def key(self, item):
+        return item
+
+    # STATISTICS
+    def size(self):
+        """Number of draws counted in the statistics."""
+        return min(self.total - self.setup_start, self.capacity)
+
+    def categories(self):
+        return self.candidates
+
+    def chi_square(self):
+        """Pearson chi-square of the counted draws against a uniform distribution, and its degrees of freedom.
+        With 'k' equiprobable categories: sum((o - n/k)^2 / (n/k)) = k * sum(o^2) / n - n."""
+        size = self.size()
+        categories = self.categories()
+        if size == 0 or categories < 2:
+            return None, 0
+        return categories * self.counts_squares / size - size, categories - 1
+
+    def summary(self):
+        size = self.size()
+        if size == 0:
+            return ""
+        chi_square, freedom = self.chi_square()
+        return f"{size} resultados" + (f"  ·  χ² {chi_square:.1f} ({freedom} gl)" if chi_square is not None else "")
+
+class RlyNumbersHistory(RlyHistory):
+    """History of generated numbers. Results are kept in an array of 64 bits integers
+    (a list is used if a result doesn't fit). Counts are kept by bucket of the generation range,
+    and mean and variance from the exact sums of the results and their squares.
+    """
+    def __init__(self, capacity:int=1000, buckets:int=10):
+        self.buckets = buckets
+        super().__init__(capacity=capacity)
+        self.min_limit = 0
+        self.values_sum = 0
+        self.squares_sum = 0
+
+    def new_ring(self):
+        return array("q", bytes(8 * self.capacity))
+
+    def encode(self, result:int):
+        if not -2**63 <= result < 2**63 and isinstance(self.ring, array):
+            self.ring = list(self.ring)
+        return result
+
+    def restart(self, setup, candidates:int):
+        super().restart(setup=setup, candidates=candidates)
+        self.min_limit = setup[0]
+        self.values_sum = 0
+        self.squares_sum = 0
+
+    def count(self, item:int):
+        super().count(item)
+        self.values_sum += item
+        self.squares_sum += item * item
+
+    def discount(self, item:int):
+        super().discount(item)
+        self.values_sum -= item
+        self.squares_sum -= item * item
+
+    def key(self, item:int):
+        # bucket of the generation range, if the range isn't divisible buckets have floor or ceil of candidates / buckets numbers
+        return (item - self.min_limit) * self.categories() // self.candidates
+
+    def categories(self):
+        return min(self.buckets, self.candidates)
+
+    def bucket_width(self, bucket:int):
+        # numbers v with floor(v * k / C) == bucket: from ceil(bucket * C / k) to ceil((bucket + 1) * C / k)
+        categories = self.categories()
+        return -(-(bucket + 1) * self.candidates // categories) + (-bucket * self.candidates // categories)
+
+    def chi_square(self):
+        """Pearson chi-square of the counted draws against a uniform distribution of the numbers, and its
+        degrees of freedom. A bucket of 'w' numbers is expected n*w/C draws: C * sum(o^2 / w) / n - n,
+        in O(buckets)."""
+        size = self.size()
+        categories = self.categories()
+        if size == 0 or categories < 2:
+            return None, 0
+        if self.candidates % categories == 0:
+            return super().chi_square()
+        weighted = sum(count * count / self.bucket_width(bucket) for bucket, count in self.counts.items())
+        return self.candidates * weighted / size - size, categories - 1
+
+    def mean(self):
+        size = self.size()
+        return self.values_sum / size if size else None
+
+    def variance(self):
+        """Sample variance, computed with integers until the last division so it has no cancellation errors."""
+        size = self.size()
+        if size < 2:
+            return None
+        return (size * self.squares_sum - self.values_sum * self.values_sum) / (size * (size - 1))
+
+    def summary(self):
+        summary = super().summary()
+        if summary:
+            summary = f"media {self.mean():.2f}  ·  " + summary
+        return summary
+
+class RlyChoicesHistory(RlyHistory):
+    """History of selected choices. Each choice is saved once in a table and the buffer keeps
+    its index in an array of 32 bits integers, so counts are kept by choice index.
+    """
+    def __init__(self, capacity:int=1000):
+        super().__init__(capacity=capacity)
+        self.values:list[str] = []
+        self.indexes:dict[str, int] = {}
+
+    def new_ring(self):
+        return array("I", bytes(4 * self.capacity))
+
+    def encode(self, result:str):
+        index = self.indexes.get(result)
+        if index is None:
+            index = self.indexes[result] = len(self.values)
+            self.values.append(result)
+        return index
+
+    def decode(self, item:int):
+        return self.values[item]
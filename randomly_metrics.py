@@ -0,0 +1,82 @@
+import atexit
+import os
+import flet as ft
+import calet_bar
+import calet_button
+from calet_theme import ClTheme
+from calet_metrics import CL_METRICS
+
+# opt-in instrumentation: RANDOMLY_METRICS=1 enables it, RANDOMLY_METRICS_FILE=<path> saves the stats when the app is closed
+METRICS_ENABLED = os.environ.get("RANDOMLY_METRICS", "") not in ("", "0")
+METRICS_FILE = os.environ.get("RANDOMLY_METRICS_FILE")
+
+def install():
+    """Wrap the controllers and the hot event handlers with the timers of 'calet_metrics.CL_METRICS'.
+    Must be called before building the app, because handlers are bound when components are built."""
+    from randomly_control import RlyNumbersController, RlyChoicesController
+    from randomly_numbers import RlyNumbersSection
+    from randomly_choices import RlySelectionSection, RlyChoicesListView
+
+    # controllers
+    CL_METRICS.instrument(RlyNumbersController, "generate_result")
+    CL_METRICS.instrument(
+        RlyChoicesController, "generate_result", "add_choice", "add_choices", "edit_choice", "remove_choice"
+    )
+    # randomly handlers
+    CL_METRICS.instrument(RlyNumbersSection, "b_generate_clicked")
+    CL_METRICS.instrument(RlySelectionSection, "b_generate_clicked")
+    CL_METRICS.instrument(RlyChoicesListView, "reload_choices_list")
+    # calet handlers
+    for name in dir(calet_bar):
+        cls = getattr(calet_bar, name)
+        if isinstance(cls, type) and "option_clicked" in cls.__dict__:
+            CL_METRICS.instrument(cls, "option_clicked")
+    for name in dir(calet_button):
+        cls = getattr(calet_button, name)
+        if isinstance(cls, type) and "b_hovered" in cls.__dict__:
+            CL_METRICS.instrument(cls, "b_hovered")
+    if METRICS_FILE:
+        atexit.register(save)
+
+def save():
+    if METRICS_FILE:
+        CL_METRICS.dump(METRICS_FILE)
+
+class RlyMetricsPanel(ft.UserControl):
+
+    def __init__(self, theme:ClTheme):
+        super().__init__()
+        self.theme = theme
+        self.visible = False
+        self.left = 0
+        self.top = 0
+        self.right = 0
+        self.bottom = 0
+
+    def build(self):
+
+        # PANEL CONTENT
+        # - metrics report
+        self.report = ft.Text(
+            value="",
+            color=self.theme.font_two,
+            size=9,
+            font_family="monospace",
+            selectable=True
+        )
+        # PANEL
+        self.panel = ft.Container(
+            bgcolor=self.theme.transparent_inverse,
+            border_radius=10,
+            padding=10,
+            content=ft.Column(scroll=ft.ScrollMode.ADAPTIVE, controls=[self.report])
+        )
+
+        return self.panel
+
+    # METODOS DE ACCION
+    def toggle(self):
+        self.visible = not self.visible
+        if self.visible:
+            self.report.value = CL_METRICS.report()
+        self.update()
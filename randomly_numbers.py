@@ -100,6 +100,7 @@ class RlyNumbersSection(RlyAppSection):
             limit_2=int(self.right_limit.value)
         )
         self.result.size = self.controller.result_size()
+        self.stats.value = self.controller.history.summary()
         self.update()
     
     def tf_blurred(self, e:ft.ControlEvent):
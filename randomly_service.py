@@ -0,0 +1,264 @@
+"""Draw service: the Randomly controllers over a small HTTP/JSON API, for kiosks and scripts of the LAN.
+
+    python randomly_service.py [--host 127.0.0.1] [--port 8765] [--workspace NAME]
+
+Endpoints (arguments in the json body of a POST or in the query string of a GET):
+    POST /numbers/draw    {"min": 1, "max": 100}                    -> {"result": 42}
+    POST /numbers/batch   {"min": 1, "max": 100, "count": 10}       -> {"results": [...]}
+    POST /choices/draw    {"filter": null, "exclude": null}         -> {"result": "..."}
+    POST /choices/batch   {"count": 10, "filter": null, "exclude": null} -> {"results": [...]}
+    POST /choices/add     {"choices": ["...", ...]}                 -> {"added": 2, "total": 10}
+    GET  /stats                                                     -> draws, history stats and latencies
+
+Connections are kept alive (HTTP/1.1) and pipelined requests are answered in order. Every request
+runs in the event loop thread, so the controllers are never used by two requests at once."""
+
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit, parse_qsl
+from calet_metrics import ClMetrics
+from randomly_control import RlyNumbersController, RlyChoicesController
+
+MAX_BODY = 8 * 2**20
+MAX_BATCH = 100000
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+class RlyServiceError(Exception):
+    """Error answered to the client with an http status."""
+    def __init__(self, status:int, message:str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class RlyDrawService:
+    """HTTP/JSON server of a numbers and a choices controller, on asyncio streams.
+    The latency of every request (from its head being read to its response being written)
+    is recorded by endpoint in 'metrics'.
+    """
+    def __init__(self, numbers_controller:RlyNumbersController=None, choices_controller:RlyChoicesController=None,
+                 host:str="127.0.0.1", port:int=8765, metrics:ClMetrics=None):
+        self.numbers_controller = numbers_controller if numbers_controller is not None else RlyNumbersController()
+        self.choices_controller = choices_controller if choices_controller is not None else RlyChoicesController()
+        self.host = host
+        self.port = port
+        self.metrics = metrics if metrics is not None else ClMetrics()
+        self.server = None
+        self.routes = {
+            ("POST", "/numbers/draw"): self.numbers_draw,
+            ("POST", "/numbers/batch"): self.numbers_batch,
+            ("POST", "/choices/draw"): self.choices_draw,
+            ("POST", "/choices/batch"): self.choices_batch,
+            ("POST", "/choices/add"): self.choices_add,
+            ("GET", "/stats"): self.stats
+        }
+
+    # METODOS DE SERVIDOR
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        # with port 0 the system chooses a free one
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def handle_connection(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter):
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    # the client closed the connection
+                    break
+                except asyncio.LimitOverrunError:
+                    self.write_response(writer, 431, {"error": "Request head too large"}, keep_alive=False)
+                    break
+                start = time.perf_counter()
+                name = "invalid"
+                try:
+                    method, target, version, headers = self.parse_head(head)
+                    keep_alive = self.is_keep_alive(version, headers)
+                    length = int(headers.get("content-length", 0))
+                    if not 0 <= length <= MAX_BODY:
+                        keep_alive = False
+                        raise RlyServiceError(413, f"The body must have at most {MAX_BODY} bytes")
+                    body = await reader.readexactly(length) if length else b""
+                    name, handler, arguments = self.route(method, target, body)
+                    status, payload = 200, self.call(handler, arguments)
+                except RlyServiceError as error:
+                    status, payload = error.status, {"error": error.message}
+                    self.metrics.error(name)
+                except (ValueError, UnicodeDecodeError):
+                    # the request can't be parsed, so the start of the next one isn't known
+                    status, payload = 400, {"error": "Malformed request"}
+                    keep_alive = False
+                    self.metrics.error(name)
+                except Exception as error:
+                    status, payload = 500, {"error": f"{type(error).__name__}: {error}"}
+                    self.metrics.error(name)
+                self.write_response(writer, status, payload, keep_alive, time.perf_counter() - start)
+                self.metrics.record(name, time.perf_counter() - start)
+                # responses of pipelined requests are queued in order, drain only waits for a slow client
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def parse_head(self, head:bytes):
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, version = lines[0].split(" ")
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                header, separator, value = line.partition(":")
+                if not separator:
+                    raise ValueError(f"Malformed header {line!r}")
+                headers[header.strip().lower()] = value.strip()
+        return method, target, version, headers
+
+    def is_keep_alive(self, version:str, headers:dict[str, str]):
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def write_response(self, writer:asyncio.StreamWriter, status:int, payload:dict, keep_alive:bool, seconds:float=0.0):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"Server-Timing: app;dur={seconds * 1000:.3f}\r\n\r\n".encode("latin-1") + body
+        )
+
+    def route(self, method:str, target:str, body:bytes):
+        """Return the endpoint name, the handler and the arguments (query string and json body) of a request."""
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for route_method, path in self.routes):
+                raise RlyServiceError(405, f"{method} isn't allowed in {url.path}")
+            raise RlyServiceError(404, f"Unknown endpoint {url.path}")
+        arguments = dict(parse_qsl(url.query))
+        if body:
+            try:
+                data = json.loads(body)
+            except ValueError:
+                raise RlyServiceError(400, "The body must be a json object")
+            if not isinstance(data, dict):
+                raise RlyServiceError(400, "The body must be a json object")
+            arguments.update(data)
+        return f"{method} {url.path}", handler, arguments
+
+    def call(self, handler, arguments:dict):
+        try:
+            return handler(**arguments)
+        except RlyServiceError:
+            raise
+        except (TypeError, ValueError, KeyError) as error:
+            raise RlyServiceError(400, f"Invalid arguments: {error}")
+
+    # METODOS DE API
+    def numbers_draw(self, min:int=0, max:int=100):
+        return {"result": self.numbers_controller.generate_result(int(min), int(max))}
+
+    def numbers_batch(self, min:int=0, max:int=100, count:int=1):
+        count = self.batch_count(count)
+        generate_result = self.numbers_controller.generate_result
+        low, high = int(min), int(max)
+        return {"results": [generate_result(low, high) for i in range(count)]}
+
+    def choices_draw(self, filter:str=None, exclude:list[str]=None):
+        return {"result": self.draw_choice(filter, exclude)}
+
+    def choices_batch(self, count:int=1, filter:str=None, exclude:list[str]=None):
+        count = self.batch_count(count)
+        return {"results": [self.draw_choice(filter, exclude) for i in range(count)]}
+
+    def choices_add(self, choices:list[str]):
+        if not isinstance(choices, list) or not all(isinstance(choice, str) for choice in choices):
+            raise RlyServiceError(400, "'choices' must be a list of strings")
+        total = len(self.choices_controller.choices)
+        self.choices_controller.add_choices(choices)
+        return {"added": len(self.choices_controller.choices) - total, "total": len(self.choices_controller.choices)}
+
+    def stats(self):
+        numbers_history = self.numbers_controller.history
+        choices_history = self.choices_controller.history
+        numbers_chi_square, numbers_freedom = numbers_history.chi_square()
+        choices_chi_square, choices_freedom = choices_history.chi_square()
+        return {
+            "numbers": {
+                "draws": numbers_history.size(),
+                "mean": numbers_history.mean() if numbers_history.size() else None,
+                "chi_square": numbers_chi_square,
+                "freedom": numbers_freedom
+            },
+            "choices": {
+                "total": len(self.choices_controller.choices),
+                "draws": choices_history.size(),
+                "chi_square": choices_chi_square,
+                "freedom": choices_freedom
+            },
+            # seconds, by endpoint
+            "latency": {name: self.metrics.stats(name) for name in sorted(self.metrics.samples)}
+        }
+
+    # METODOS DE ACCION
+    def batch_count(self, count:int):
+        count = int(count)
+        if not 1 <= count <= MAX_BATCH:
+            raise RlyServiceError(400, f"'count' must be between 1 and {MAX_BATCH}")
+        return count
+
+    def draw_choice(self, filter:str, exclude:list[str]):
+        if exclude is not None and (not isinstance(exclude, list) or not all(isinstance(name, str) for name in exclude)):
+            raise RlyServiceError(400, "'exclude' must be a list of exclusion set names")
+        # the controller keeps its last result when no choice matches, the service answers null
+        self.choices_controller.last_result = None
+        return self.choices_controller.generate_result(filter=filter, exclude=exclude)
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/JSON draw service of the Randomly controllers")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (0.0.0.0 for the whole LAN)")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    parser.add_argument("--workspace", default=None, help="choices workspace to draw from (saved when the service stops)")
+    args = parser.parse_args()
+
+    choices_controller = RlyChoicesController()
+    workspaces = None
+    if args.workspace is not None:
+        from randomly_workspaces import RlyWorkspaces
+        workspaces = RlyWorkspaces()
+        workspaces.switch(choices_controller, args.workspace)
+    service = RlyDrawService(choices_controller=choices_controller, host=args.host, port=args.port)
+    print(f"Randomly draw service on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if workspaces is not None:
+            workspaces.save_all()
+
+if __name__ == "__main__":
+    main()
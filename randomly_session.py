@@ -0,0 +1,283 @@
+import atexit
+import hashlib
+import json
+import os
+import random
+import struct
+import sys
+import warnings
+
+# JOURNAL FORMAT
+# header: magic, format version, python version (major, minor), seed length + seed (signed, little endian)
+# records: 1 byte opcode + payload
+JOURNAL_MAGIC = b"RLYS"
+# version 2 adds the tags of the choices (OP_CALL_STATE), older journals can still be replayed
+JOURNAL_VERSION = 2
+OP_ADD_CHOICE = 1
+OP_ADD_CHOICES = 2
+OP_EDIT_CHOICE = 3
+OP_REMOVE_CHOICE = 4
+OP_DRAW_NUMBERS = 5
+OP_DRAW_NUMBERS_BIG = 6
+OP_DRAW_CHOICE = 7
+OP_SPLIT_GROUPS = 8
+OP_DERANGEMENT = 9
+OP_CALL = 10
+OP_CALL_STATE = 11
+# choices controller methods a journal can call: draws (OP_CALL) and changes of the draws state (OP_CALL_STATE)
+REPLAY_CALLS = frozenset(("generate_result", "generate_derangement", "solve_groups", "generate_bracket", "generate_stratified"))
+REPLAY_STATE_CALLS = frozenset((
+    "exclude_choices", "include_choices", "delete_exclusion", "tag_choices", "untag_choice", "restore_workspace", "undo", "redo"
+))
+NO_STRING = 0xFFFFFFFF
+INT32_MIN = -2**31
+INT32_MAX = 2**31 - 1
+HEADER = struct.Struct("<4sBBBH")
+NUMBERS = struct.Struct("<iii")
+LENGTH = struct.Struct("<I")
+
+class RlyDrawSession:
+    """Seeded draw session. All the draws use the session generator, created from a known seed,
+    and every operation changing the result of a draw (choices edition, filters, draws) is appended
+    to a compact binary journal, so the session can be replayed offline with 'replay_session'.
+    """
+    def __init__(self, seed:int=None):
+        self.seed = seed if seed is not None else int.from_bytes(os.urandom(16), "little")
+        self.rng = random.Random(self.seed)
+        self.journal = bytearray()
+        self.draws = 0
+
+    # METODOS DE REGISTRO
+    def write_string(self, value:str):
+        if value is None:
+            self.journal += LENGTH.pack(NO_STRING)
+        else:
+            data = value.encode("utf-8")
+            self.journal += LENGTH.pack(len(data))
+            self.journal += data
+
+    def record_add_choice(self, choice:str):
+        self.journal.append(OP_ADD_CHOICE)
+        self.write_string(choice)
+
+    def record_add_choices(self, choices:list[str]):
+        self.journal.append(OP_ADD_CHOICES)
+        self.journal += LENGTH.pack(len(choices))
+        for choice in choices:
+            self.write_string(choice)
+
+    def record_edit_choice(self, old:str, new:str):
+        self.journal.append(OP_EDIT_CHOICE)
+        self.write_string(old)
+        self.write_string(new)
+
+    def record_remove_choice(self, choice:str):
+        self.journal.append(OP_REMOVE_CHOICE)
+        self.write_string(choice)
+
+    def record_draw_numbers(self, limit_1:int, limit_2:int, result:int):
+        self.draws += 1
+        if INT32_MIN <= min(limit_1, limit_2) and max(limit_1, limit_2) <= INT32_MAX:
+            self.journal.append(OP_DRAW_NUMBERS)
+            self.journal += NUMBERS.pack(limit_1, limit_2, result)
+        else:
+            # limits out of 32 bits are saved as text
+            self.journal.append(OP_DRAW_NUMBERS_BIG)
+            for value in (limit_1, limit_2, result):
+                self.write_string(str(value))
+
+    def record_draw_choice(self, filter:str, result:str):
+        self.draws += 1
+        self.journal.append(OP_DRAW_CHOICE)
+        self.write_string(filter)
+        self.write_string(result)
+
+    def record_split_groups(self, groups:int, seed:int, shuffled:list[str]):
+        # the shuffled choices are saved as a digest, groups are slices of them
+        self.draws += 1
+        self.journal.append(OP_SPLIT_GROUPS)
+        self.journal += LENGTH.pack(groups)
+        self.write_string(str(seed) if seed is not None else None)
+        self.journal += groups_digest(shuffled)
+
+    def record_derangement(self, forbidden:list[tuple[str, str]], mutual:bool, seed:int, receivers:list[str]):
+        self.draws += 1
+        self.journal.append(OP_DERANGEMENT)
+        self.journal += LENGTH.pack(len(forbidden))
+        for giver, receiver in forbidden:
+            self.write_string(giver)
+            self.write_string(receiver)
+        self.journal.append(1 if mutual else 0)
+        self.write_string(str(seed) if seed is not None else None)
+        self.journal += groups_digest(receivers)
+
+    def record_call(self, method:str, arguments:dict, result):
+        # generic record of a choices controller method: its json arguments (in their order, it can change
+        # the result) and a digest of its json result
+        self.draws += 1
+        self.journal.append(OP_CALL)
+        self.write_string(method)
+        self.write_string(json.dumps(arguments))
+        self.journal += result_digest(result)
+
+    def record_state_call(self, method:str, arguments:dict):
+        # a choices controller method that changes the state used by the draws, but isn't a draw
+        self.journal.append(OP_CALL_STATE)
+        self.write_string(method)
+        self.write_string(json.dumps(arguments))
+
+    # METODOS DE ACCION
+    def header(self):
+        seed = self.seed.to_bytes((self.seed.bit_length() + 8) // 8, "little", signed=True)
+        return HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, sys.version_info[0], sys.version_info[1], len(seed)) + seed
+
+    def save(self, path:str):
+        """Write the session (seed and journal) in a file."""
+        with open(path, "wb") as file:
+            file.write(self.header())
+            file.write(self.journal)
+
+    @classmethod
+    def load(cls, path:str):
+        """Read a session saved with 'save'. The generator is reset to the seed, not to the end of the journal."""
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, major, minor, seed_length = HEADER.unpack_from(data, 0)
+        if magic != JOURNAL_MAGIC or not 1 <= version <= JOURNAL_VERSION:
+            raise ValueError(f"{path} is not a draw session journal (version {JOURNAL_VERSION} or older)")
+        if (major, minor) != sys.version_info[:2]:
+            # the results of random.Random are only guaranteed for the same python version
+            warnings.warn(f"Session saved with python {major}.{minor}, loaded with {sys.version_info[0]}.{sys.version_info[1]}")
+        position = HEADER.size + seed_length
+        session = cls(seed=int.from_bytes(data[HEADER.size:position], "little", signed=True))
+        session.journal = bytearray(data[position:])
+        return session
+
+def groups_digest(shuffled:list[str]):
+    return hashlib.blake2b("\0".join(shuffled).encode("utf-8"), digest_size=8).digest()
+
+def result_digest(result):
+    # results that aren't json types (brackets...) are saved with their 'to_json' method
+    return hashlib.blake2b(json.dumps(result, default=lambda value: value.to_json()).encode("utf-8"), digest_size=8).digest()
+
+def replay_session(session:RlyDrawSession):
+    """Run again all the operations of a session with new controllers and a generator
+    created from its seed. Return the number of verified draws, or raise ValueError at the first
+    draw with a different result.
+    """
+    from randomly_control import RlyNumbersController, RlyChoicesController
+
+    rng = random.Random(session.seed)
+    numbers_controller = RlyNumbersController()
+    choices_controller = RlyChoicesController()
+    for controller in (numbers_controller, choices_controller):
+        # replayed operations aren't audited nor journaled again
+        controller.audit = None
+        controller.session = None
+        controller.rng = rng
+    generate_number = numbers_controller.generate_result
+    generate_choice = choices_controller.generate_result
+    unpack_numbers = NUMBERS.unpack_from
+    unpack_length = LENGTH.unpack_from
+    numbers_size = NUMBERS.size
+
+    data = bytes(session.journal)
+    end = len(data)
+    position = 0
+    draws = 0
+
+    def read_string():
+        nonlocal position
+        length, = unpack_length(data, position)
+        position += 4
+        if length == NO_STRING:
+            return None
+        position += length
+        return data[position - length:position].decode("utf-8")
+
+    while position < end:
+        opcode = data[position]
+        position += 1
+        if opcode == OP_DRAW_NUMBERS:
+            limit_1, limit_2, expected = unpack_numbers(data, position)
+            position += numbers_size
+            result = generate_number(limit_1, limit_2)
+        elif opcode == OP_DRAW_CHOICE:
+            filter = read_string()
+            expected = read_string()
+            result = generate_choice(filter=filter)
+        elif opcode == OP_DRAW_NUMBERS_BIG:
+            limit_1, limit_2, expected = (int(read_string()) for i in range(3))
+            result = generate_number(limit_1, limit_2)
+        elif opcode == OP_SPLIT_GROUPS:
+            groups, = unpack_length(data, position)
+            position += 4
+            seed = read_string()
+            expected = data[position:position + 8]
+            position += 8
+            split = choices_controller.split_groups(groups, seed=int(seed) if seed is not None else None)
+            result = groups_digest([choice for group in split for choice in group])
+        elif opcode == OP_DERANGEMENT:
+            count, = unpack_length(data, position)
+            position += 4
+            forbidden = [(read_string(), read_string()) for i in range(count)]
+            mutual = data[position] == 1
+            position += 1
+            seed = read_string()
+            expected = data[position:position + 8]
+            position += 8
+            pairs = choices_controller.generate_derangement(
+                forbidden=forbidden, mutual=mutual, seed=int(seed) if seed is not None else None
+            )
+            result = groups_digest([receiver for giver, receiver in pairs])
+        elif opcode == OP_CALL:
+            method = read_string()
+            if method not in REPLAY_CALLS:
+                raise ValueError(f"Unknown draw method {method!r} at byte {position} of the journal")
+            arguments = json.loads(read_string())
+            expected = data[position:position + 8]
+            position += 8
+            try:
+                result = result_digest(getattr(choices_controller, method)(**arguments))
+            except ValueError as error:
+                # the call failed when it was journaled too (see 'RlyController.record_error')
+                result = result_digest({"error": str(error)})
+        elif opcode == OP_CALL_STATE:
+            method = read_string()
+            if method not in REPLAY_STATE_CALLS:
+                raise ValueError(f"Unknown state method {method!r} at byte {position} of the journal")
+            getattr(choices_controller, method)(**json.loads(read_string()))
+            continue
+        elif opcode == OP_ADD_CHOICE:
+            choices_controller.add_choice(read_string())
+            continue
+        elif opcode == OP_ADD_CHOICES:
+            count, = unpack_length(data, position)
+            position += 4
+            choices_controller.add_choices([read_string() for i in range(count)])
+            continue
+        elif opcode == OP_EDIT_CHOICE:
+            old = read_string()
+            choices_controller.edit_choice(old=old, new=read_string())
+            continue
+        elif opcode == OP_REMOVE_CHOICE:
+            choices_controller.remove_choice(read_string())
+            continue
+        else:
+            raise ValueError(f"Unknown opcode {opcode} at byte {position - 1} of the journal")
+        draws += 1
+        if result != expected:
+            raise ValueError(f"Draw {draws} doesn't match: journal {expected!r}, replay {result!r}")
+    return draws
+
+# draw session of the app, enabled with RANDOMLY_SESSION_FILE=<path>, saved when the app is closed
+RLY_SESSION = RlyDrawSession() if os.environ.get("RANDOMLY_SESSION_FILE") else None
+if RLY_SESSION is not None:
+    atexit.register(RLY_SESSION.save, os.environ["RANDOMLY_SESSION_FILE"])
+
+if __name__ == "__main__":
+    # offline verification: python randomly_session.py <journal file>
+    import time
+    start = time.perf_counter()
+    draws = replay_session(RlyDrawSession.load(sys.argv[1]))
+    print(f"{draws} draws verified in {time.perf_counter() - start:.2f} s")
@@ -0,0 +1,241 @@
+import random
+
+class RlyPickSet:
+    """Set with O(1) add, discard and random pick (the items are kept in a list with their positions)."""
+
+    def __init__(self):
+        self.items:list = []
+        self.positions:dict = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item):
+        if item not in self.positions:
+            self.positions[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item):
+        position = self.positions.pop(item, None)
+        if position is not None:
+            last = self.items.pop()
+            if last != item:
+                self.items[position] = last
+                self.positions[last] = position
+
+    def pick(self, rng:random.Random):
+        return self.items[int(rng.random() * len(self.items))]
+
+class RlyGroupingSolver:
+    """Random grouping of choices in groups of balanced sizes under constraints:\n
+    ---
+    - separate: lists of choices that must not share a group (every pair of each list is a conflict).
+    - spread: category of each choice (a department, a level...). Every group must have the same
+    number of choices of each category, or one of difference.
+
+    A greedy assignment (most constrained choices first) is repaired by local search (min-conflicts with
+    random walk): a choice breaking a constraint is swapped with the best of some random choices of other
+    groups. The conflicts of every choice with every group and the count of every category in every group
+    are updated on each swap, so a step costs O(conflicts of the two choices) and not O(n).
+    """
+    def __init__(self, choices:list[str], groups:int, separate:list[list[str]]=None, spread:dict[str, str]=None,
+                 rng:random.Random=None, candidates:int=16, noise:float=0.1):
+        if groups < 1:
+            raise ValueError("The number of groups must be 1 or more")
+        self.choices = choices
+        self.count = len(choices)
+        self.groups = min(groups, self.count) or 1
+        self.rng = rng if rng is not None else random.Random()
+        self.candidates = candidates
+        self.noise = noise
+        indexes = {choice: index for index, choice in enumerate(choices)}
+
+        # conflicts graph
+        self.neighbors:list[set[int]] = [set() for i in range(self.count)]
+        for members in separate or ():
+            members = [indexes[choice] for choice in members if choice in indexes]
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    if a != b:
+                        self.neighbors[a].add(b)
+                        self.neighbors[b].add(a)
+
+        # categories, with the min and max count of each one in a group
+        names = {}
+        self.category = [names.setdefault((spread or {}).get(choice), len(names)) for choice in choices]
+        totals = [0] * len(names)
+        for category in self.category:
+            totals[category] += 1
+        self.low = [total // self.groups for total in totals]
+        self.high = [-(-total // self.groups) for total in totals]
+        self.by_category:list[list[int]] = [[] for total in totals]
+        for x, category in enumerate(self.category):
+            self.by_category[category].append(x)
+
+    def penalty(self, category:int, count:int):
+        return max(0, count - self.high[category]) + max(0, self.low[category] - count)
+
+    def solve(self, max_steps:int=None):
+        """Return the groups (lists of choices), or raise ValueError if the constraints
+        aren't satisfied after 'max_steps' swaps (default: 50 per choice)."""
+        rng = self.rng
+        groups = self.groups
+        max_steps = max_steps if max_steps is not None else 50 * self.count + 1000
+        self.initial_assignment()
+
+        group_of = self.group_of
+        step = 0
+        while self.conflicted or self.unbalanced:
+            if step >= max_steps:
+                raise ValueError(
+                    f"No valid grouping found in {max_steps} steps ({self.conflicts_total} conflicts, {self.spread_total} spread errors left)"
+                )
+            step += 1
+            # candidates to swap with x are taken from 'pool' (all the choices if it's None)
+            pool = None
+            if self.conflicted:
+                x = self.conflicted.pick(rng)
+            else:
+                category, group = divmod(self.unbalanced.pick(rng), groups)
+                members = self.members[group]
+                x = members[int(rng.random() * len(members))]
+                if self.category_counts[category][group] > self.high[category]:
+                    # too many members of the category: one of them leaves the group
+                    while self.category[x] != category:
+                        x = members[int(rng.random() * len(members))]
+                else:
+                    # too few members of the category: another one leaves its place to a member of it
+                    while self.category[x] == category:
+                        x = members[int(rng.random() * len(members))]
+                    pool = self.by_category[category]
+            a = group_of[x]
+
+            best = None
+            best_delta = None
+            for i in range(self.candidates):
+                y = int(rng.random() * self.count) if pool is None else pool[int(rng.random() * len(pool))]
+                if group_of[y] == a:
+                    continue
+                delta = self.swap_delta(x, y)
+                if best is None or delta < best_delta:
+                    best, best_delta = y, delta
+            if best is None:
+                continue
+            if best_delta <= 0 or rng.random() < self.noise:
+                self.swap(x, best)
+
+        return [[self.choices[i] for i in members] for members in self.members]
+
+    def initial_assignment(self):
+        rng = self.rng
+        groups = self.groups
+        order = list(range(self.count))
+        rng.shuffle(order)
+        # most constrained choices first, random order between equals
+        order.sort(key=lambda i: len(self.neighbors[i]), reverse=True)
+        size, extra = divmod(self.count, groups)
+        capacity = [size + (1 if group < extra else 0) for group in range(groups)]
+
+        self.group_of = [0] * self.count
+        self.members:list[list[int]] = [[] for group in range(groups)]
+        self.position = [0] * self.count
+        self.conflicts = [[0] * groups for i in range(self.count)]
+        self.category_counts = [[0] * groups for category in self.low]
+        for x in order:
+            start = int(rng.random() * groups)
+            best = None
+            best_cost = None
+            category = self.category[x]
+            for offset in range(groups):
+                group = (start + offset) % groups
+                if len(self.members[group]) >= capacity[group]:
+                    continue
+                count = self.category_counts[category][group]
+                cost = self.conflicts[x][group] + (count + 1 > self.high[category])
+                if best is None or cost < best_cost:
+                    best, best_cost = group, cost
+            self.place(x, best)
+
+        # costs of the initial assignment
+        self.conflicted = RlyPickSet()
+        self.unbalanced = RlyPickSet()
+        self.conflicts_total = 0
+        for x in range(self.count):
+            if self.conflicts[x][self.group_of[x]]:
+                self.conflicted.add(x)
+                self.conflicts_total += self.conflicts[x][self.group_of[x]]
+        self.conflicts_total //= 2
+        self.spread_total = 0
+        for category in range(len(self.low)):
+            for group in range(groups):
+                self.update_cell(category, group, 0)
+
+    def place(self, x:int, group:int):
+        self.group_of[x] = group
+        self.position[x] = len(self.members[group])
+        self.members[group].append(x)
+        self.category_counts[self.category[x]][group] += 1
+        for neighbor in self.neighbors[x]:
+            self.conflicts[neighbor][group] += 1
+
+    def update_cell(self, category:int, group:int, old_penalty:int):
+        # keep the set of (category, group) cells with too many or too few members and the total spread penalty
+        penalty = self.penalty(category, self.category_counts[category][group])
+        self.spread_total += penalty - old_penalty
+        if penalty:
+            self.unbalanced.add(category * self.groups + group)
+        else:
+            self.unbalanced.discard(category * self.groups + group)
+
+    def swap_delta(self, x:int, y:int):
+        a = self.group_of[x]
+        b = self.group_of[y]
+        conflicts = self.conflicts
+        # if x and y are in conflict, it's counted in both groups but disappears with the swap
+        linked = y in self.neighbors[x] if conflicts[x][b] else False
+        delta = (conflicts[x][b] - conflicts[x][a]) + (conflicts[y][a] - conflicts[y][b]) - 2 * linked
+        category_x = self.category[x]
+        category_y = self.category[y]
+        if category_x != category_y:
+            counts_x = self.category_counts[category_x]
+            counts_y = self.category_counts[category_y]
+            penalty = self.penalty
+            delta += (
+                penalty(category_x, counts_x[a] - 1) - penalty(category_x, counts_x[a])
+                + penalty(category_x, counts_x[b] + 1) - penalty(category_x, counts_x[b])
+                + penalty(category_y, counts_y[b] - 1) - penalty(category_y, counts_y[b])
+                + penalty(category_y, counts_y[a] + 1) - penalty(category_y, counts_y[a])
+            )
+        return delta
+
+    def swap(self, x:int, y:int):
+        a = self.group_of[x]
+        b = self.group_of[y]
+        conflicts = self.conflicts
+        self.conflicts_total += conflicts[x][b] + conflicts[y][a] - conflicts[x][a] - conflicts[y][b] - 2 * (y in self.neighbors[x])
+        # move x to b and y to a
+        cells = {(self.category[x], a), (self.category[x], b), (self.category[y], a), (self.category[y], b)}
+        old_penalties = {cell: self.penalty(cell[0], self.category_counts[cell[0]][cell[1]]) for cell in cells}
+        for neighbor in self.neighbors[x]:
+            conflicts[neighbor][a] -= 1
+            conflicts[neighbor][b] += 1
+        for neighbor in self.neighbors[y]:
+            conflicts[neighbor][b] -= 1
+            conflicts[neighbor][a] += 1
+        self.members[a][self.position[x]] = y
+        self.members[b][self.position[y]] = x
+        self.position[x], self.position[y] = self.position[y], self.position[x]
+        self.group_of[x] = b
+        self.group_of[y] = a
+        self.category_counts[self.category[x]][a] -= 1
+        self.category_counts[self.category[x]][b] += 1
+        self.category_counts[self.category[y]][b] -= 1
+        self.category_counts[self.category[y]][a] += 1
+        for cell, old_penalty in old_penalties.items():
+            self.update_cell(cell[0], cell[1], old_penalty)
+        # choices whose conflicts changed
+        for item in (x, y, *self.neighbors[x], *self.neighbors[y]):
+            if conflicts[item][self.group_of[item]]:
+                self.conflicted.add(item)
+            else:
+                self.conflicted.discard(item)
@@ -21,12 +21,24 @@ class RlyAppSection(ft.UserControl):
             text_align=ft.TextAlign.CENTER,
             weight=ft.FontWeight.BOLD
         )
+        # - history statistics text
+        self.stats = ft.Text(
+            value="",
+            color=self.theme.font_one,
+            size=10,
+            text_align=ft.TextAlign.CENTER
+        )
         # - result panel
         self.result_panel = ft.Container(
             expand=True,
             padding=5,
             alignment=ft.alignment.center,
-            content=self.result
+            content=ft.Column(
+                spacing=5,
+                alignment=ft.MainAxisAlignment.CENTER,
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                controls=[self.result, self.stats]
+            )
         )
 
         # ACTIONS PANEL
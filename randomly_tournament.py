@@ -0,0 +1,146 @@
+BRACKET_MODES = ("single", "double", "round_robin")
+
+class RlyMatch:
+    """Match of a bracket. Each side is an entrant (str) or a reference to the result
+    of a previous match: ("winner", number) or ("loser", number).
+    """
+    __slots__ = ("number", "round", "stage", "home", "away")
+
+    def __init__(self, number:int, round:int, stage:str, home, away):
+        self.number = number
+        self.round = round
+        self.stage = stage
+        self.home = home
+        self.away = away
+
+    def winner(self):
+        return ("winner", self.number)
+
+    def loser(self):
+        return ("loser", self.number)
+
+    def to_json(self):
+        return [self.number, self.round, self.stage, self.home, self.away]
+
+    def __repr__(self):
+        return f"RlyMatch({self.number}, round={self.round}, stage={self.stage!r}, {self.home!r} vs {self.away!r})"
+
+class RlyBracket:
+    """Tournament between seeded entrants (the order of 'entrants'):\n
+    ---
+    - single: single elimination. The bracket is completed to a power of two with byes, given to the first seeds:
+    a side without rival goes on to the next round without a match.
+    - double: double elimination, with a losers stage and a grand final. Losers rounds with only byes are skipped.
+    - round_robin: everybody plays everybody once, scheduled with the circle method (a bye each round if the number is odd).
+
+    Rounds are generated lazily by 'rounds()', one list of matches at a time, so big tournaments
+    never keep all their matches in memory (a round robin of n entrants has n(n-1)/2 matches).
+    """
+    def __init__(self, entrants:list[str], mode:str="single"):
+        if mode not in BRACKET_MODES:
+            raise ValueError(f"The bracket mode must be one of {BRACKET_MODES}")
+        if len(entrants) < 2:
+            raise ValueError("At least 2 entrants are needed")
+        self.entrants = entrants
+        self.mode = mode
+
+    def __iter__(self):
+        return self.rounds()
+
+    def rounds(self):
+        """Generate the rounds of the tournament, each one as a list of 'RlyMatch'."""
+        if self.mode == "round_robin":
+            return self.round_robin_rounds()
+        return self.elimination_rounds(double=self.mode == "double")
+
+    def rounds_count(self):
+        if self.mode == "round_robin":
+            return len(self.entrants) - 1 + len(self.entrants) % 2
+        if self.mode == "single":
+            return (len(self.entrants) - 1).bit_length()
+        # losers rounds with only byes depend on the number of byes, they're counted generating the bracket (O(n))
+        return sum(1 for matches in self.elimination_rounds(double=True))
+
+    def first_round(self):
+        # the first seeds play against a bye, the rest of them are paired in order
+        size = 1 << (len(self.entrants) - 1).bit_length()
+        byes = size - len(self.entrants)
+        sides = []
+        for entrant in self.entrants[:byes]:
+            sides.extend((entrant, None))
+        sides.extend(self.entrants[byes:])
+        return [(sides[i], sides[i + 1]) for i in range(0, size, 2)]
+
+    def elimination_rounds(self, double:bool=False):
+        number = 0
+        round = 0
+
+        def play(stage:str, pairs):
+            # matches of the pairs with two sides, and the sides going on from every pair: the winner and the
+            # loser of its match, or the only side of a pair without match (None if the pair has no side)
+            nonlocal number
+            matches = []
+            winners = []
+            losers = []
+            for home, away in pairs:
+                if home is None or away is None:
+                    winners.append(away if home is None else home)
+                    losers.append(None)
+                    continue
+                number += 1
+                match = RlyMatch(number, round + 1, stage, home, away)
+                matches.append(match)
+                winners.append(match.winner())
+                losers.append(match.loser())
+            return matches, winners, losers
+
+        # with at least 2 entrants the first round and every winners round have a match
+        matches, winners, dropped = play("winners", self.first_round())
+        round += 1
+        yield matches
+        # losers of the winners stage waiting to enter the losers stage, and the losers stage survivors
+        survivors = None
+        while len(winners) > 1:
+            if double:
+                # losers of the first round play between them, then the survivors of the losers stage
+                playing = dropped if survivors is None else survivors
+                matches, survivors, eliminated = play("losers", zip(playing[0::2], playing[1::2]))
+                if matches:
+                    round += 1
+                    yield matches
+            matches, winners, dropped = play("winners", zip(winners[0::2], winners[1::2]))
+            round += 1
+            yield matches
+            if double:
+                # losers of the new winners round face the losers stage survivors
+                matches, survivors, eliminated = play("losers", zip(survivors, reversed(dropped)))
+                if matches:
+                    round += 1
+                    yield matches
+        if double:
+            # with 2 entrants there is no losers stage, the loser of the first match plays the final
+            matches, winners, dropped = play("final", [(winners[0], survivors[0] if survivors is not None else dropped[0])])
+            yield matches
+
+    def round_robin_rounds(self):
+        # circle method: the first entrant stays, the others turn one place each round
+        circle = list(self.entrants)
+        if len(circle) % 2:
+            circle.append(None)
+        size = len(circle)
+        number = 0
+        for round in range(1, size):
+            matches = []
+            for i in range(size // 2):
+                home, away = circle[i], circle[size - 1 - i]
+                if home is not None and away is not None:
+                    number += 1
+                    # alternate home and away of the fixed entrant
+                    if i == 0 and round % 2 == 0:
+                        home, away = away, home
+                    matches.append(RlyMatch(number, round, "league", home, away))
+            yield matches
+            circle.insert(1, circle.pop())
+
+    def to_json(self):
+        return {"mode": self.mode, "entrants": self.entrants}
@@ -0,0 +1,128 @@
+import json
+import os
+import warnings
+from collections import OrderedDict
+from urllib.parse import quote, unquote
+from randomly_history import RlyChoicesHistory
+from randomly_solver import RlyPickSet
+from randomly_exclusions import RlyExclusionSets
+from randomly_edits import RlyEditJournal
+
+DEFAULT_WORKSPACE = "Principal"
+
+class RlyWorkspace:
+    """Choice store of a workspace: the choices list and its indexes (tags, exclusion sets,
+    history, edit journal). 'RlyChoicesController' draws from the fields of the workspace in use.
+    """
+    __slots__ = ("name", "choices", "history", "tags", "tag_index", "exclusions", "rank_select", "edits")
+
+    def __init__(self, name:str, choices:list[str]=None, tags:dict[str, list[str]]=None, exclusions:dict[str, str]=None):
+        self.name = name
+        self.choices:list[str] = list(choices or [])
+        self.history = RlyChoicesHistory()
+        self.tags:dict[str, set[str]] = {}
+        self.tag_index:dict[str, RlyPickSet] = {}
+        for choice, choice_tags in (tags or {}).items():
+            self.tags[choice] = set(choice_tags)
+            for tag in choice_tags:
+                self.tag_index.setdefault(tag, RlyPickSet()).add(choice)
+        # exclusion bitsets are saved as hexadecimal strings
+        self.exclusions = RlyExclusionSets()
+        self.exclusions.sets = {set_name: int(bits, 16) for set_name, bits in (exclusions or {}).items()}
+        self.rank_select = None
+        # editions can be undone until the workspace is evicted or the app closed
+        self.edits = RlyEditJournal()
+
+    def to_json(self):
+        return {
+            "choices": self.choices,
+            "tags": {choice: sorted(choice_tags) for choice, choice_tags in self.tags.items()},
+            "exclusions": {set_name: format(bits, "x") for set_name, bits in self.exclusions.sets.items()}
+        }
+
+class RlyWorkspaces:
+    """Named workspaces (employees, clients, prizes...) saved as json files in 'directory'
+    (by 'save_all', which the app calls when it's closed).
+    Workspaces are loaded from disk the first time they're used and kept in an LRU of at most
+    'max_loaded' workspaces: the least recently used one is saved and removed from memory.
+    Switching to a loaded workspace is O(1).
+    """
+    def __init__(self, directory:str=None, max_loaded:int=4):
+        if max_loaded < 1:
+            raise ValueError("At least 1 workspace must be kept in memory")
+        self.directory = directory if directory is not None else os.environ.get(
+            "RANDOMLY_WORKSPACES_DIR", os.path.join(os.path.expanduser("~"), ".randomly", "workspaces")
+        )
+        self.max_loaded = max_loaded
+        self.loaded:OrderedDict[str, RlyWorkspace] = OrderedDict()
+        # controller using the last switched workspace, its fields are the current ones of the workspace
+        self.controller = None
+
+    def path(self, name:str):
+        return os.path.join(self.directory, quote(name, safe="") + ".json")
+
+    def names(self):
+        names = set(self.loaded)
+        if os.path.isdir(self.directory):
+            names.update(unquote(file[:-5]) for file in os.listdir(self.directory) if file.endswith(".json"))
+        return sorted(names)
+
+    def get(self, name:str):
+        """Workspace 'name', loaded from disk or created empty if it isn't in memory."""
+        workspace = self.loaded.get(name)
+        if workspace is not None:
+            self.loaded.move_to_end(name)
+            return workspace
+        path = self.path(name)
+        workspace = None
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    workspace = RlyWorkspace(name, **json.load(file))
+            except (ValueError, TypeError) as error:
+                # a damaged file is kept aside (it isn't listed) and the workspace starts empty
+                os.replace(path, path + ".damaged")
+                warnings.warn(f"Workspace {name!r} can't be read ({error}), it's kept in {path}.damaged")
+        if workspace is None:
+            workspace = RlyWorkspace(name)
+        self.loaded[name] = workspace
+        self.evict()
+        return workspace
+
+    def evict(self):
+        while len(self.loaded) > self.max_loaded:
+            name, workspace = self.loaded.popitem(last=False)
+            self.save(workspace)
+
+    def switch(self, controller, name:str):
+        """Make 'controller' draw from the workspace 'name'."""
+        # no draw nor edition of the controller can run between storing the old workspace and using the new one
+        with controller.lock:
+            if controller.workspace is not None:
+                # the controller may have replaced its lists, they're kept before the workspace can be evicted
+                controller.store_workspace()
+            workspace = self.get(name)
+            controller.use_workspace(workspace)
+        self.controller = controller
+        return workspace
+
+    def save(self, workspace:RlyWorkspace):
+        # written in a temporary file first, so a crash never leaves a half written workspace
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(workspace.name)
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(workspace.to_json(), file, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def save_all(self):
+        if self.controller is not None and self.controller.workspace is not None:
+            self.controller.store_workspace()
+        for workspace in self.loaded.values():
+            self.save(workspace)
+
+    def delete(self, name:str):
+        if self.controller is not None and self.controller.workspace is not None and self.controller.workspace.name == name:
+            raise ValueError("The workspace in use can't be deleted")
+        self.loaded.pop(name, None)
+        if os.path.exists(self.path(name)):
+            os.remove(self.path(name))
@@ -0,0 +1,8 @@
+"""Shared setup of the tests: the project modules are imported from the project folder."""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
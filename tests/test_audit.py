@@ -0,0 +1,34 @@
+import pytest
+from randomly_audit import RlyAuditLog, verify_audit_log
+
+def write_records(path:str, count:int):
+    log = RlyAuditLog(str(path))
+    for i in range(count):
+        log.record(controller="numbers", result=i)
+    log.close()
+
+def test_log_goes_on_after_an_incomplete_last_line(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    write_records(path, 3)
+    with open(path, "ab") as file:
+        file.write(b'{"controller": "numbers", "prev": "ab')
+    with pytest.warns(UserWarning):
+        write_records(path, 2)
+    assert verify_audit_log(str(path)) == 5
+
+def test_log_with_only_an_incomplete_line_starts_a_new_chain(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    path.write_bytes(b'{"contr')
+    with pytest.warns(UserWarning):
+        write_records(path, 2)
+    assert verify_audit_log(str(path)) == 2
+
+def test_damaged_last_record_raises_value_error(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    write_records(path, 2)
+    with open(path, "ab") as file:
+        file.write(b"not json\n")
+    with pytest.raises(ValueError):
+        RlyAuditLog(str(path))
+    with pytest.raises(ValueError, match="line 3"):
+        verify_audit_log(str(path))
@@ -0,0 +1,67 @@
+import json
+import random
+import pytest
+from randomly_audit import RlyAuditLog
+from randomly_control import RlyChoicesController
+from randomly_session import RlyDrawSession, replay_session
+
+def choices_controller(size:int, audit:RlyAuditLog=None):
+    controller = RlyChoicesController(audit=audit)
+    controller.session = None
+    controller.rng = random.Random(11)
+    controller.add_choices([f"person-{i}" for i in range(size)])
+    return controller
+
+def cycle_length(pairs:list[tuple[str, str]]):
+    receivers = dict(pairs)
+    start = pairs[0][0]
+    length, current = 1, receivers[start]
+    while current != start:
+        length, current = length + 1, receivers[current]
+    return length
+
+@pytest.mark.parametrize("size", [2, 3, 10, 500])
+def test_derangement_is_a_single_cycle_without_fixed_points(size:int):
+    controller = choices_controller(size)
+    for seed in range(20):
+        pairs = controller.generate_derangement(seed=seed)
+        assert [giver for giver, receiver in pairs] == controller.choices
+        assert sorted(receiver for giver, receiver in pairs) == sorted(controller.choices)
+        assert all(giver != receiver for giver, receiver in pairs)
+        assert cycle_length(pairs) == size
+
+def test_derangement_avoids_forbidden_pairs():
+    controller = choices_controller(60)
+    rng = random.Random(3)
+    forbidden = [tuple(rng.sample(controller.choices, 2)) for i in range(40)]
+    for seed in range(20):
+        pairs = set(controller.generate_derangement(forbidden=forbidden, mutual=True, seed=seed))
+        for giver, receiver in forbidden:
+            assert (giver, receiver) not in pairs and (receiver, giver) not in pairs
+        assert cycle_length(list(pairs)) == 60
+
+def test_audit_record_is_a_copy_of_the_returned_pairs(tmp_path):
+    log = RlyAuditLog(str(tmp_path / "audit.jsonl"), commit_interval=60)
+    controller = choices_controller(8, audit=log)
+    forbidden = [["person-0", "person-1"]]
+    pairs = controller.generate_derangement(forbidden=forbidden, seed=5)
+    expected = [list(pair) for pair in pairs]
+    # the caller changes its lists before the audit thread writes the record
+    pairs.clear()
+    forbidden.append(["person-2", "person-3"])
+    log.close()
+    record = json.loads((tmp_path / "audit.jsonl").read_text().splitlines()[-1])
+    assert record["result"] == expected
+    assert record["forbidden"] == [["person-0", "person-1"]]
+
+def test_failed_derangement_keeps_the_replay_in_sync():
+    session = RlyDrawSession(seed=5)
+    controller = RlyChoicesController(session=session)
+    controller.audit = None
+    controller.add_choices([f"p{i}" for i in range(20)])
+    forbidden = [("p0", f"p{i}") for i in range(1, 20)]
+    with pytest.raises(ValueError, match="can't be avoided"):
+        controller.generate_derangement(forbidden=forbidden, mutual=False)
+    for i in range(20):
+        controller.generate_result()
+    assert replay_session(session) == session.draws
@@ -0,0 +1,25 @@
+import random
+import pytest
+from randomly_history import RlyNumbersHistory, RlyChoicesHistory
+
+@pytest.mark.parametrize("low, high", [(0, 100), (1, 6), (0, 9), (-7, 1000)])
+def test_numbers_chi_square_weights_buckets_by_width(low:int, high:int):
+    history = RlyNumbersHistory()
+    rng = random.Random(low + high)
+    results = [rng.randint(low, high) for i in range(1000)]
+    for result in results:
+        history.add(result, setup=(low, high), candidates=high - low + 1)
+    candidates = high - low + 1
+    categories = min(10, candidates)
+    expected = 0.0
+    for bucket in range(categories):
+        numbers = [n for n in range(low, high + 1) if (n - low) * categories // candidates == bucket]
+        drawn = sum(1 for result in results if result in numbers)
+        share = len(results) * len(numbers) / candidates
+        expected += (drawn - share) ** 2 / share
+    chi_square, freedom = history.chi_square()
+    assert chi_square == pytest.approx(expected)
+    assert freedom == categories - 1
+
+def test_choices_ring_uses_32_bit_indexes():
+    assert RlyChoicesHistory().ring.itemsize == 4
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import random
+from randomly_control import RlyNumbersController, RlyChoicesController
+from randomly_service import RlyDrawService
+
+def request(method:str, path:str, body:dict=None, headers:str=""):
+    data = json.dumps(body).encode("utf-8") if body is not None else b""
+    return f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n{headers}Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data
+
+async def read_response(reader:asyncio.StreamReader):
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    headers = {line.partition(":")[0].lower(): line.partition(":")[2].strip() for line in head[1:] if line}
+    body = await reader.readexactly(int(headers["content-length"]))
+    return int(head[0].split(" ")[1]), headers, json.loads(body)
+
+def run_service(client):
+    """Run 'client(service, reader, writer)' against a service listening on a free localhost port."""
+    async def main():
+        numbers_controller = RlyNumbersController()
+        choices_controller = RlyChoicesController()
+        for controller in (numbers_controller, choices_controller):
+            controller.audit = controller.session = None
+            controller.rng = random.Random(7)
+        service = await RlyDrawService(numbers_controller, choices_controller, port=0).start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+        try:
+            return await client(service, reader, writer)
+        finally:
+            writer.close()
+            await service.close()
+    return asyncio.run(main())
+
+def test_pipelined_requests_are_answered_in_order():
+    async def client(service, reader, writer):
+        writer.write(
+            request("POST", "/choices/add", {"choices": ["ana", "beto", "carla"]})
+            + request("POST", "/choices/batch", {"count": 50})
+            + request("POST", "/numbers/batch", {"min": 1, "max": 6, "count": 100})
+            + request("GET", "/stats")
+        )
+        return [await read_response(reader) for i in range(4)]
+
+    responses = run_service(client)
+    assert [status for status, headers, body in responses] == [200, 200, 200, 200]
+    added, choices, numbers, stats = [body for status, headers, body in responses]
+    assert added == {"added": 3, "total": 3}
+    assert set(choices["results"]) <= {"ana", "beto", "carla"} and len(choices["results"]) == 50
+    assert all(1 <= number <= 6 for number in numbers["results"]) and len(numbers["results"]) == 100
+    assert stats["numbers"]["draws"] == 100 and stats["choices"]["draws"] == 50
+    assert stats["latency"]["POST /numbers/batch"]["count"] == 1
+
+def test_connection_is_kept_alive_until_closed():
+    async def client(service, reader, writer):
+        responses = []
+        for i in range(3):
+            writer.write(request("POST", "/numbers/draw", {"min": 1, "max": 10}))
+            responses.append(await read_response(reader))
+        writer.write(request("POST", "/numbers/draw", {"min": 1, "max": 10}, headers="Connection: close\r\n"))
+        responses.append(await read_response(reader))
+        return responses, await reader.read()
+
+    responses, rest = run_service(client)
+    assert [headers["connection"] for status, headers, body in responses] == ["keep-alive"] * 3 + ["close"]
+    assert all(1 <= body["result"] <= 10 for status, headers, body in responses)
+    assert "server-timing" in responses[0][1]
+    assert rest == b""
+
+def test_errors_keep_the_connection_usable():
+    async def client(service, reader, writer):
+        writer.write(
+            request("POST", "/unknown")
+            + request("GET", "/numbers/draw")
+            + request("POST", "/numbers/batch", {"count": 0})
+            + request("POST", "/choices/draw", {"filter": "z"})
+        )
+        return [await read_response(reader) for i in range(4)]
+
+    statuses = [status for status, headers, body in run_service(client)]
+    assert statuses == [404, 405, 400, 200]
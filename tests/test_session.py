@@ -0,0 +1,93 @@
+import sys
+import threading
+import pytest
+from randomly_control import RlyNumbersController, RlyChoicesController
+from randomly_session import RlyDrawSession, replay_session, HEADER
+
+def play_session(session:RlyDrawSession):
+    numbers_controller = RlyNumbersController(session=session)
+    choices_controller = RlyChoicesController(session=session)
+    for controller in (numbers_controller, choices_controller):
+        controller.audit = None
+    choices_controller.add_choices([f"person-{i}" for i in range(40)])
+    choices_controller.add_choice("extra")
+    choices_controller.edit_choice("person-3", "person-three")
+    choices_controller.remove_choice("person-5")
+    choices_controller.tag_choices({f"person-{i}": ["norte" if i % 2 else "sur"] for i in range(40)})
+    choices_controller.exclude_choices("staff", ["person-1", "person-2"])
+    for i in range(200):
+        numbers_controller.generate_result(1, 6)
+        numbers_controller.generate_result(-2**40, 2**40)
+        choices_controller.generate_result(filter="person-1" if i % 3 else None)
+        choices_controller.generate_result(exclude=["staff"])
+    list(choices_controller.split_groups(4))
+    choices_controller.generate_derangement(forbidden=[("person-0", "person-7")])
+    choices_controller.solve_groups(3, separate=[["person-0", "person-1"]])
+    choices_controller.generate_bracket("double")
+    choices_controller.generate_stratified(winners=5)
+    choices_controller.undo()
+    choices_controller.redo()
+    return session.draws
+
+def test_saved_session_replays_every_draw(tmp_path):
+    session = RlyDrawSession(seed=2024)
+    draws = play_session(session)
+    path = str(tmp_path / "session.rlys")
+    session.save(path)
+    loaded = RlyDrawSession.load(path)
+    assert loaded.seed == 2024
+    assert replay_session(loaded) == draws
+
+def test_changed_journal_fails_the_replay():
+    session = RlyDrawSession(seed=7)
+    play_session(session)
+    RlyNumbersController(session=session).generate_result(1, 6)
+    # the last byte of the journal is the high byte of that result
+    session.journal[-1] ^= 0xFF
+    with pytest.raises(ValueError, match="doesn't match"):
+        replay_session(session)
+
+def test_other_python_version_warns(tmp_path):
+    session = RlyDrawSession(seed=1)
+    path = tmp_path / "session.rlys"
+    session.save(str(path))
+    data = bytearray(path.read_bytes())
+    magic, version, major, minor, seed_length = HEADER.unpack_from(data, 0)
+    HEADER.pack_into(data, 0, magic, version, major, (minor + 1) % 256, seed_length)
+    path.write_bytes(data)
+    with pytest.warns(UserWarning, match="python"):
+        RlyDrawSession.load(str(path))
+
+def test_draws_from_several_threads_replay():
+    session = RlyDrawSession(seed=11)
+    numbers_controller = RlyNumbersController(session=session)
+    choices_controller = RlyChoicesController(session=session)
+    for controller in (numbers_controller, choices_controller):
+        controller.audit = None
+    choices_controller.add_choices([f"person-{i}" for i in range(100)])
+    # switching threads as often as possible makes the draws of the threads interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        workers = [
+            threading.Thread(target=lambda: [numbers_controller.generate_result(1, 1000) for i in range(20000)]),
+            threading.Thread(target=lambda: [choices_controller.generate_result() for i in range(20000)]),
+            threading.Thread(target=lambda: [choices_controller.add_choice(f"new-{i}") for i in range(1000)])
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert replay_session(session) == session.draws == 40000
+
+def test_journal_calls_only_replay_methods():
+    session = RlyDrawSession(seed=3)
+    session.record_state_call("remove_choice", {"choice": "person-0"})
+    with pytest.raises(ValueError, match="Unknown state method 'remove_choice'"):
+        replay_session(session)
+    session = RlyDrawSession(seed=3)
+    session.record_call("__init__", {}, None)
+    with pytest.raises(ValueError, match="Unknown draw method '__init__'"):
+        replay_session(session)
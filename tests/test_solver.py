@@ -0,0 +1,63 @@
+import json
+import random
+import pytest
+from randomly_audit import RlyAuditLog
+from randomly_control import RlyChoicesController
+from randomly_session import RlyDrawSession, replay_session
+from randomly_solver import RlyGroupingSolver
+
+def roster(size:int):
+    return [f"person-{i}" for i in range(size)]
+
+@pytest.mark.parametrize("size, groups", [(12, 3), (50, 4), (301, 7)])
+def test_groups_respect_separate_and_spread(size:int, groups:int):
+    choices = roster(size)
+    rng = random.Random(size)
+    separate = [rng.sample(choices, groups) for i in range(size // 10)]
+    spread = {choice: rng.choice(["ventas", "soporte", "datos"]) for choice in choices}
+    solver = RlyGroupingSolver(choices, groups, separate=separate, spread=spread, rng=random.Random(1))
+    result = solver.solve()
+
+    assert sorted(choice for group in result for choice in group) == sorted(choices)
+    sizes = [len(group) for group in result]
+    assert max(sizes) - min(sizes) <= 1
+    group_of = {choice: number for number, group in enumerate(result) for choice in group}
+    for members in separate:
+        assert len({group_of[choice] for choice in members}) == len(members)
+    for category in set(spread.values()):
+        total = sum(1 for choice in choices if spread[choice] == category)
+        for group in result:
+            count = sum(1 for choice in group if spread[choice] == category)
+            assert total // groups <= count <= -(-total // groups)
+
+def test_impossible_separation_raises_value_error():
+    choices = roster(6)
+    with pytest.raises(ValueError):
+        RlyGroupingSolver(choices, 2, separate=[choices[:3]], rng=random.Random(1)).solve(max_steps=200)
+
+def test_failed_solve_keeps_the_replay_in_sync():
+    session = RlyDrawSession(seed=3)
+    controller = RlyChoicesController(session=session)
+    controller.audit = None
+    controller.add_choices(["a", "b", "c", "d"])
+    with pytest.raises(ValueError):
+        controller.solve_groups(2, separate=[["a", "b", "c"]], max_steps=50)
+    for i in range(20):
+        controller.generate_result()
+    assert replay_session(session) == session.draws
+
+def test_audit_record_is_a_copy_of_the_returned_groups(tmp_path):
+    log = RlyAuditLog(str(tmp_path / "audit.jsonl"), commit_interval=60)
+    controller = RlyChoicesController(audit=log)
+    controller.session = None
+    controller.add_choices(roster(9))
+    separate = [["person-0", "person-1"]]
+    result = controller.solve_groups(3, separate=separate, seed=4)
+    expected = [list(group) for group in result]
+    # the caller changes the lists before the audit thread writes the record
+    result[0].clear()
+    separate[0].append("person-2")
+    log.close()
+    record = json.loads((tmp_path / "audit.jsonl").read_text().splitlines()[-1])
+    assert record["result"] == expected
+    assert record["separate"] == [["person-0", "person-1"]]
@@ -0,0 +1,56 @@
+import json
+import pytest
+from randomly_audit import RlyAuditLog
+from randomly_control import RlyChoicesController
+from randomly_session import RlyDrawSession, replay_session
+from randomly_tournament import RlyBracket, BRACKET_MODES
+
+@pytest.mark.parametrize("mode", BRACKET_MODES)
+@pytest.mark.parametrize("size", [2, 3, 5, 8, 13, 33])
+def test_rounds_match_rounds_count_and_have_no_empty_sides(mode:str, size:int):
+    bracket = RlyBracket([f"entrant-{i}" for i in range(size)], mode)
+    rounds = list(bracket)
+    assert len(rounds) == bracket.rounds_count()
+    for number, matches in enumerate(rounds, start=1):
+        assert matches
+        for match in matches:
+            assert match.round == number
+            assert match.home is not None and match.away is not None
+
+@pytest.mark.parametrize("size", [2, 3, 5, 6, 17])
+def test_elimination_entrants_and_results_are_used_once(size:int):
+    for mode, matches_count in (("single", size - 1), ("double", 2 * size - 2)):
+        bracket = RlyBracket([f"entrant-{i}" for i in range(size)], mode)
+        matches = [match for matches in bracket for match in matches]
+        assert [match.number for match in matches] == list(range(1, matches_count + 1))
+        sides = [side for match in matches for side in (match.home, match.away)]
+        assert sorted(side for side in sides if isinstance(side, str)) == sorted(bracket.entrants)
+        references = [side for side in sides if isinstance(side, tuple)]
+        assert len(references) == len(set(references))
+
+def test_five_entrants_double_has_no_phantom_matches():
+    rounds = list(RlyBracket(list("abcde"), "double"))
+    assert [matches[0].stage for matches in rounds] == ["winners", "winners", "losers", "losers", "winners", "losers", "final"]
+
+def test_failed_bracket_keeps_the_replay_in_sync():
+    session = RlyDrawSession(seed=9)
+    controller = RlyChoicesController(session=session)
+    controller.audit = None
+    controller.add_choices([f"entrant-{i}" for i in range(16)])
+    with pytest.raises(ValueError):
+        controller.generate_bracket("swiss")
+    for i in range(20):
+        controller.generate_result()
+    assert replay_session(session) == session.draws
+
+def test_audit_record_is_a_copy_of_the_entrants(tmp_path):
+    log = RlyAuditLog(str(tmp_path / "audit.jsonl"), commit_interval=60)
+    controller = RlyChoicesController(audit=log)
+    controller.session = None
+    controller.add_choices([f"team-{i}" for i in range(6)])
+    bracket = controller.generate_bracket("double", seed=3)
+    expected = list(bracket.entrants)
+    bracket.entrants.reverse()
+    log.close()
+    record = json.loads((tmp_path / "audit.jsonl").read_text().splitlines()[-1])
+    assert record["result"] == expected
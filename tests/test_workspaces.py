@@ -0,0 +1,32 @@
+import pytest
+import randomly_workspaces
+from randomly_control import RlyChoicesController
+from randomly_workspaces import RlyWorkspaces
+
+def test_damaged_workspace_starts_empty_and_is_kept_aside(tmp_path):
+    (tmp_path / "Clientes.json").write_text('{"choices": ["ana", "lu', encoding="utf-8")
+    workspaces = RlyWorkspaces(directory=str(tmp_path))
+    controller = RlyChoicesController()
+    controller.session = None
+    with pytest.warns(UserWarning, match="Clientes"):
+        workspaces.switch(controller, "Clientes")
+    assert controller.choices == []
+    assert (tmp_path / "Clientes.json.damaged").exists()
+    assert workspaces.names() == ["Clientes"]
+
+def test_saved_workspace_is_loaded_again(tmp_path):
+    workspaces = RlyWorkspaces(directory=str(tmp_path))
+    controller = RlyChoicesController()
+    controller.session = None
+    workspaces.switch(controller, "Premios")
+    controller.add_choices(["viaje", "cena"])
+    controller.tag_choice("viaje", ["grande"])
+    workspaces.save_all()
+    controller = RlyChoicesController()
+    controller.session = None
+    RlyWorkspaces(directory=str(tmp_path)).switch(controller, "Premios")
+    assert controller.choices == ["viaje", "cena"]
+    assert controller.tags == {"viaje": {"grande"}}
+
+def test_importing_creates_no_workspaces():
+    assert not any(isinstance(value, RlyWorkspaces) for value in vars(randomly_workspaces).values())